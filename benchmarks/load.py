@@ -0,0 +1,119 @@
+"""
+/api/rooms, /api/timetable 종단 부하 테스트.
+실제 main.app (미들웨어, lifespan, 인덱스 적재 포함)을 httpx ASGITransport 로 프로세스 안에서 호출하고,
+MongoDB 대신 가상 캠퍼스를 넣은 mongomock_motor 를 쓴다.
+네트워크/실제 Mongo 비용은 빠지므로 절대값보다 같은 기계에서의 회귀 비교용이다.
+(mongomock 은 인덱스 없이 전체를 훑으므로 /api/timetable 수치는 scale 에 비례해 커진다)
+"""
+from typing import Any, Callable, Dict, List, Tuple
+from benchmarks.report import summarize
+from benchmarks.synthetic import Campus, KOR_DAYS
+from collections import Counter
+from db.mongo import LECTURES_COLL, ROOMS_COLL, MongoManager
+import asyncio
+import random
+import time
+
+DEFAULT_REQUESTS = 2_000
+DEFAULT_CONCURRENCY = 32
+WARMUP_REQUESTS = 50
+# 실제로 접속하지 않는 주소 (Motor 는 첫 명령 때 연결하므로 클라이언트 생성만으로는 접속하지 않음)
+STAND_IN_URI = "mongodb://127.0.0.1:1/benchmark"
+
+Request = Tuple[str, Dict[str, Any]]
+Scenario = Callable[[random.Random], Request]
+
+
+def _stand_in_manager(database) -> type:
+    class InProcessMongoManager(MongoManager):
+        """MongoManager 와 같은 인터페이스에 데이터베이스만 mongomock_motor 로 바꾼 것."""
+
+        def __init__(self, uri=None):
+            super().__init__(STAND_IN_URI)
+            self.database = database
+
+    return InProcessMongoManager
+
+
+async def seed_database(campus: Campus):
+    from mongomock_motor import AsyncMongoMockClient  # benchmarks/requirements.txt
+
+    database = AsyncMongoMockClient()["benchmark"]
+    # insert_many 가 _id 를 채워 넣으므로 복사본을 넣는다
+    await database[LECTURES_COLL].insert_many([dict(lec) for lec in campus.lectures])
+    await database[ROOMS_COLL].insert_many([dict(doc) for doc in campus.catalog])
+    return database
+
+
+def scenarios(campus: Campus) -> Dict[str, Scenario]:
+    buildings = campus.buildings
+    fixed_building = buildings[0]
+
+    def rooms(rnd: random.Random) -> Request:
+        return "/api/rooms", {
+            "building": rnd.choice(buildings),
+            "hour": rnd.randint(8, 21),
+            "minute": rnd.choice((0, 15, 30, 45)),
+            "weekday": rnd.choice(KOR_DAYS),
+        }
+
+    def rooms_cached(rnd: random.Random) -> Request:
+        # 같은 조건 반복 → 응답 캐시 적중 경로
+        return "/api/rooms", {"building": fixed_building, "hour": 10, "minute": 30, "weekday": "월"}
+
+    def timetable(rnd: random.Random) -> Request:
+        building = rnd.choice(buildings)
+        return "/api/timetable", {
+            "building": building,
+            "room_number": rnd.choice(campus.rooms[building]),
+            "weekday": rnd.choice(KOR_DAYS),
+        }
+
+    return {"load.rooms": rooms, "load.rooms.cached": rooms_cached, "load.timetable": timetable}
+
+
+async def _drive(client, scenario: Scenario, requests: int, concurrency: int,
+                 seed: int) -> Tuple[List[float], float, Counter]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = requests
+
+    async def worker(worker_id: int):
+        nonlocal remaining
+        rnd = random.Random(seed * 1000 + worker_id)
+        while remaining > 0:
+            remaining -= 1
+            path, params = scenario(rnd)
+            started = time.perf_counter()
+            response = await client.get(path, params=params)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - started
+    return latencies, len(latencies) / wall, statuses
+
+
+async def run_load(campus: Campus, requests: int = DEFAULT_REQUESTS,
+                   concurrency: int = DEFAULT_CONCURRENCY, seed: int = 0) -> List[Dict[str, Any]]:
+    import httpx
+    import main
+
+    database = await seed_database(campus)
+    main.MongoManager = _stand_in_manager(database)
+
+    results = []
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name, scenario in scenarios(campus).items():
+                await _drive(client, scenario, WARMUP_REQUESTS, min(concurrency, WARMUP_REQUESTS), seed)
+                latencies, throughput, statuses = await _drive(client, scenario, requests, concurrency, seed)
+                results.append(summarize(
+                    name, campus.scale, "request", latencies, throughput,
+                    concurrency=concurrency,
+                    errors=sum(n for code, n in statuses.items() if code >= 400),
+                    statuses={str(code): n for code, n in sorted(statuses.items())},
+                ))
+    return results
@@ -0,0 +1,134 @@
+"""
+순수 함수/인덱스 단위 마이크로 벤치마크.
+- rooms: extract_floor, determine_room_status, build_room_statuses(/api/rooms 의 인덱스 경로 본체)
+- ingest: parse_schedule(캐시 비운 상태 / 캐시 적중), OccupancyIndex.load, process_excel_file
+각 측정은 fn 한 번이 items 개를 처리하며, 결과는 item 당 시간의 p50/p99 와 초당 item 수.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+from benchmarks.report import summarize
+from benchmarks.synthetic import Campus, DAYS, schedule_strings, write_registrar_excel
+from routes.rooms import build_room_statuses, determine_room_status
+from utils.occupancy import OccupancyIndex
+from utils.room_utils import extract_floor
+import os
+import random
+import tempfile
+import time
+
+DEFAULT_REPEAT = 50
+MIN_SAMPLE_SECONDS = 0.005  # 표본 하나가 이보다 짧으면 반복 횟수를 늘려 타이머 오차를 줄임
+MAX_BATCH = 10_000
+SCHEDULE_STRINGS = 2_000
+ROOM_QUERIES = 200
+REGISTRAR_ROWS = 3_000  # scale=1 기준 학사 엑셀 행 수
+
+
+def measure(fn: Callable[[], Any], items: int, repeat: int = DEFAULT_REPEAT) -> Tuple[List[float], float]:
+    """(item 당 시간 표본(초), 초당 item 수). fn 은 호출마다 items 개를 처리해야 한다."""
+    fn()  # 워밍업 (import, 지연 초기화 등)
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started >= MIN_SAMPLE_SECONDS or number >= 1 << 16:
+            break
+        number *= 2
+
+    samples: List[float] = []
+    total = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        total += elapsed
+        samples.append(elapsed / (number * items))
+    return samples, items * number * repeat / total
+
+
+def _bench(name: str, scale: int, fn: Callable[[], Any], items: int,
+           repeat: int = DEFAULT_REPEAT, **extra: Any) -> Dict[str, Any]:
+    samples, throughput = measure(fn, items, repeat)
+    return summarize(name, scale, "item", samples, throughput, items=items, **extra)
+
+
+def room_benchmarks(campus: Campus, repeat: int = DEFAULT_REPEAT, seed: int = 0) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    scale = campus.scale
+    results = []
+
+    rooms = [doc["room"] for doc in campus.catalog[:MAX_BATCH]]
+
+    def floors():
+        for room in rooms:
+            extract_floor(room)
+
+    results.append(_bench("micro.extract_floor", scale, floors, len(rooms), repeat))
+
+    cases = []
+    for lec in rnd.sample(campus.lectures, min(MAX_BATCH, len(campus.lectures))):
+        target = lec["start_min"] - rnd.randint(-30, 120)
+        in_use = target >= lec["start_min"]
+        cases.append((target, None if in_use else lec, lec if in_use else None))
+
+    def statuses():
+        for target, nxt, cur in cases:
+            determine_room_status(target, nxt, cur)
+
+    results.append(_bench("micro.determine_room_status", scale, statuses, len(cases), repeat))
+
+    index = OccupancyIndex()
+    index.load(campus.lectures, campus.catalog, source="benchmark")
+    queries = [
+        (str(rnd.choice(campus.buildings)), rnd.choice(DAYS), rnd.randint(8 * 60, 21 * 60))
+        for _ in range(ROOM_QUERIES)
+    ]
+
+    def buildings():
+        for building, day, target in queries:
+            build_room_statuses(index, building, day, target)
+
+    results.append(_bench("micro.build_room_statuses", scale, buildings, len(queries), repeat))
+    return results
+
+
+def ingest_benchmarks(campus: Campus, repeat: int = DEFAULT_REPEAT, seed: int = 0) -> List[Dict[str, Any]]:
+    # pandas 는 데이터 적재 스크립트에만 쓰이므로 여기서 import
+    from data.excel_to_json import _parse_schedule_cached, parse_schedule, process_excel_file
+
+    scale = campus.scale
+    results = []
+    strings = schedule_strings(SCHEDULE_STRINGS, campus.buildings, seed)
+
+    def parse_cold():
+        _parse_schedule_cached.cache_clear()
+        for s in strings:
+            parse_schedule(s)
+
+    def parse_warm():
+        for s in strings:
+            parse_schedule(s)
+
+    results.append(_bench("ingest.parse_schedule.cold", scale, parse_cold, len(strings), repeat))
+    _parse_schedule_cached.cache_clear()
+    results.append(_bench("ingest.parse_schedule.warm", scale, parse_warm, len(strings), repeat))
+
+    def load_index():
+        OccupancyIndex().load(campus.lectures, campus.catalog, source="benchmark")
+
+    results.append(_bench(
+        "ingest.occupancy_index_load", scale, load_index, len(campus.lectures), max(3, repeat // 10),
+    ))
+
+    rows = REGISTRAR_ROWS * scale
+    with tempfile.TemporaryDirectory(prefix="vacant_room_bench_") as tmp:
+        path = os.path.join(tmp, "registrar.xlsx")
+        write_registrar_excel(path, rows, campus.buildings, seed)
+
+        def parse_excel():
+            _parse_schedule_cached.cache_clear()
+            process_excel_file(path)
+
+        results.append(_bench("ingest.process_excel_file", scale, parse_excel, rows, 3))
+    return results
@@ -0,0 +1,105 @@
+"""
+벤치마크 결과 요약과 기준선(JSON) 저장/비교.
+
+결과 파일 형식:
+{
+  "meta": {"created_at": ..., "python": ..., "platform": ..., "commit": ..., "args": {...}},
+  "results": [
+    {"name": "micro.extract_floor", "scale": 1, "unit": "item", "samples": 50,
+     "p50_us": ..., "p99_us": ..., "mean_us": ..., "throughput_per_s": ..., ...}
+  ]
+}
+p50_us/p99_us 는 한 단위(item 또는 request)당 시간(마이크로초), throughput_per_s 는 초당 처리량.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+import json
+import os
+import platform
+import subprocess
+import sys
+
+KST = ZoneInfo("Asia/Seoul")
+
+DEFAULT_TOLERANCE = 0.2  # p50/p99 가 기준선보다 20% 넘게 느려지면 회귀
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """선형 보간 백분위수 (q: 0~100). sorted_values 는 오름차순."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(name: str, scale: int, unit: str, samples_s: Sequence[float],
+              throughput_per_s: float, **extra: Any) -> Dict[str, Any]:
+    """samples_s: 단위당 시간(초) 표본."""
+    values = sorted(samples_s)
+    return {
+        "name": name,
+        "scale": scale,
+        "unit": unit,
+        "samples": len(values),
+        "p50_us": round(percentile(values, 50) * 1e6, 3),
+        "p99_us": round(percentile(values, 99) * 1e6, 3),
+        "mean_us": round(sum(values) / len(values) * 1e6, 3) if values else 0.0,
+        "throughput_per_s": round(throughput_per_s, 1),
+        **extra,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def build_report(results: List[Dict[str, Any]], args: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "created_at": datetime.now(KST).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "commit": _git_commit(),
+            "args": args,
+        },
+        "results": results,
+    }
+
+
+def write_report(path: str, report: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def print_results(results: List[Dict[str, Any]]):
+    print(f"{'benchmark':<34}{'scale':>6}{'p50(us)':>14}{'p99(us)':>14}{'throughput/s':>16}")
+    for r in results:
+        print(f"{r['name']:<34}{r['scale']:>6}{r['p50_us']:>14,.1f}{r['p99_us']:>14,.1f}{r['throughput_per_s']:>16,.1f}")
+
+
+def compare(baseline_path: str, results: List[Dict[str, Any]], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """기준선 대비 p50/p99 가 tolerance 비율 넘게 늘어난 항목 설명 목록 (비어 있으면 통과)."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for r in results:
+        old = baseline.get((r["name"], r["scale"]))
+        if old is None:
+            continue
+        for field in ("p50_us", "p99_us"):
+            if old[field] > 0 and r[field] > old[field] * (1 + tolerance):
+                regressions.append(
+                    f"{r['name']} (scale={r['scale']}) {field}: {old[field]:,.1f} → {r[field]:,.1f} "
+                    f"(+{(r[field] / old[field] - 1) * 100:.0f}%)"
+                )
+    return regressions
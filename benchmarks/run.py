@@ -0,0 +1,92 @@
+"""
+벤치마크 실행 (저장소 루트에서):
+
+    pip install -r requirements.txt -r benchmarks/requirements.txt
+    python -m benchmarks.run                                   # scale 1, 10 / 부하 테스트는 scale 1
+    python -m benchmarks.run --scales 1,10,100 --suites rooms,ingest
+    python -m benchmarks.run --out benchmarks/results/main.json
+    python -m benchmarks.run --compare benchmarks/results/main.json   # 회귀가 있으면 종료 코드 1
+
+결과 JSON 형식은 benchmarks/report.py 참고.
+"""
+from typing import Any, Dict, List
+from benchmarks import load, micro
+from benchmarks.report import DEFAULT_TOLERANCE, build_report, compare, print_results, write_report
+from benchmarks.synthetic import generate_campus
+import argparse
+import asyncio
+import sys
+import time
+
+SUITES = ("rooms", "ingest", "load")
+DEFAULT_OUT = "benchmarks/results/latest.json"
+
+
+def _scales(value: str) -> List[int]:
+    return [int(s) for s in value.split(",") if s.strip()]
+
+
+def _suites(value: str) -> List[str]:
+    suites = [s.strip() for s in value.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"알 수 없는 suite: {', '.join(sorted(unknown))}")
+    return suites
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="빈 강의실 백엔드 벤치마크")
+    parser.add_argument("--scales", type=_scales, default=[1, 10], help="마이크로 벤치마크 캠퍼스 배율 (기본 1,10)")
+    parser.add_argument("--load-scales", type=_scales, default=[1], help="부하 테스트 캠퍼스 배율 (기본 1)")
+    parser.add_argument("--suites", type=_suites, default=list(SUITES), help="rooms,ingest,load 중 선택")
+    parser.add_argument("--repeat", type=int, default=micro.DEFAULT_REPEAT, help="마이크로 벤치마크 표본 수")
+    parser.add_argument("--requests", type=int, default=load.DEFAULT_REQUESTS, help="부하 테스트 시나리오당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=load.DEFAULT_CONCURRENCY, help="부하 테스트 동시 요청 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="결과(기준선) JSON 경로")
+    parser.add_argument("--compare", metavar="BASELINE", help="이 기준선 JSON 과 비교해 회귀를 보고")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="허용 지연 증가 비율 (기본 0.2)")
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    scales = sorted(set(args.scales) | (set(args.load_scales) if "load" in args.suites else set()))
+    for scale in scales:
+        started = time.perf_counter()
+        campus = generate_campus(scale, args.seed)
+        print(f"가상 캠퍼스 생성 {campus.summary()} ({time.perf_counter() - started:.1f}s)")
+
+        if scale in args.scales:
+            if "rooms" in args.suites:
+                results.extend(micro.room_benchmarks(campus, args.repeat, args.seed))
+            if "ingest" in args.suites:
+                results.extend(micro.ingest_benchmarks(campus, args.repeat, args.seed))
+        if "load" in args.suites and scale in args.load_scales:
+            results.extend(asyncio.run(load.run_load(campus, args.requests, args.concurrency, args.seed)))
+    return results
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    results = run(args)
+    print_results(results)
+
+    write_report(args.out, build_report(results, {
+        k: v for k, v in vars(args).items() if k not in ("out", "compare")
+    }))
+    print(f"결과 저장: {args.out}")
+
+    if args.compare:
+        regressions = compare(args.compare, results, args.tolerance)
+        if regressions:
+            print(f"기준선({args.compare}) 대비 회귀:")
+            for line in regressions:
+                print("  -", line)
+            return 1
+        print(f"기준선({args.compare}) 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,142 @@
+"""
+벤치마크용 가상 캠퍼스 / 학사 엑셀 생성기.
+scale=1 이 현재 캠퍼스 규모(건물 BASE_BUILDINGS 개, 건물당 강의실 약 30개, 강의실당 주 15~25개 강의)이고
+scale=10, 100 은 건물 수를 늘려 강의실/강의 수가 같은 비율로 늘어난다. 같은 seed 면 항상 같은 데이터.
+"""
+from typing import Any, Dict, List, Optional
+from utils.room_utils import room_catalog_doc
+import random
+
+BASE_BUILDINGS = 12
+FIRST_BUILDING = 101
+# 층 → 층당 강의실 수
+FLOOR_LAYOUT = {"B1": 3, "1": 5, "2": 6, "3": 6, "4": 5, "5": 3, "12": 2}
+LECTURES_PER_ROOM = (15, 25)
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday")
+KOR_DAYS = "월화수목금토"
+PROFESSORS = ("김교수", "이교수", "박교수", "최교수", "정교수", "미정")
+# 75분 수업 / 교시(60분) 수업 시작 시각 (자정 기준 분)
+SLOT_STARTS = tuple(range(9 * 60, 21 * 60, 75)) + tuple(range(8 * 60, 22 * 60, 60))
+DURATIONS = (50, 75, 100, 150)
+
+
+class Campus:
+    __slots__ = ("scale", "lectures", "catalog", "rooms")
+
+    def __init__(self, scale: int, lectures: List[Dict[str, Any]], catalog: List[Dict[str, Any]],
+                 rooms: Dict[int, List[str]]):
+        self.scale = scale
+        self.lectures = lectures  # excel_to_json 결과 + start_min/end_min (Mongo 강의 도큐먼트와 같은 형태)
+        self.catalog = catalog    # rooms 컬렉션 도큐먼트
+        self.rooms = rooms        # 건물 → 강의실 이름
+
+    @property
+    def buildings(self) -> List[int]:
+        return list(self.rooms)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "scale": self.scale,
+            "buildings": len(self.rooms),
+            "rooms": len(self.catalog),
+            "lectures": len(self.lectures),
+        }
+
+
+def _hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def building_rooms(building: int, rnd: random.Random) -> List[str]:
+    rooms = []
+    for floor, count in FLOOR_LAYOUT.items():
+        for n in range(1, count + 1):
+            rooms.append(f"{floor}{n:02d}")
+    # 일부 건물에는 '305-1' 같은 분할 강의실
+    if rnd.random() < 0.3:
+        rooms.append("305-1")
+    return rooms
+
+
+def generate_campus(scale: int = 1, seed: int = 0) -> Campus:
+    rnd = random.Random(seed)
+    lectures: List[Dict[str, Any]] = []
+    catalog: List[Dict[str, Any]] = []
+    rooms_by_building: Dict[int, List[str]] = {}
+
+    for b in range(BASE_BUILDINGS * scale):
+        building = FIRST_BUILDING + b
+        rooms = building_rooms(building, rnd)
+        rooms_by_building[building] = rooms
+        for room in rooms:
+            catalog.append(room_catalog_doc(building, room))
+            for _ in range(rnd.randint(*LECTURES_PER_ROOM)):
+                start = rnd.choice(SLOT_STARTS)
+                end = min(start + rnd.choice(DURATIONS), 23 * 60 + 59)
+                course = rnd.randint(10000, 99999)
+                lectures.append({
+                    "building": building,
+                    "room": room,
+                    "day": rnd.choice(DAYS),
+                    "start_time": _hhmm(start),
+                    "end_time": _hhmm(end),
+                    "course_id": f"{course}-0{rnd.randint(1, 5)}",
+                    "course_name": f"과목{course % 500}",
+                    "professor": rnd.choice(PROFESSORS),
+                    "start_min": start,
+                    "end_min": end,
+                })
+    # rooms 컬렉션을 CATALOG_SORT 로 읽은 것과 같은 순서
+    catalog.sort(key=lambda doc: (doc["building"], doc["sort_key"]))
+    return Campus(scale, lectures, catalog, rooms_by_building)
+
+
+def schedule_string(rnd: random.Random, buildings: List[int]) -> Optional[str]:
+    """학사 엑셀 '강의시간' 열에 나오는 형식들 (data/excel_to_json.parse_schedule 이 처리하는 경우를 고르게)."""
+    b = rnd.choice(buildings)
+    room = rnd.choice(("B101", "203", "414", "1201", "305-1"))
+    d1, d2 = rnd.sample(KOR_DAYS, 2)
+    start = rnd.randint(9, 17)
+    kind = rnd.randrange(8)
+    if kind == 0:
+        return f"{d1}13:30~14:45, {d2}13:30~14:45 / {b}관 {room}호"
+    if kind == 1:
+        return f"{d1}0,1,2, {d2}0,1,2 / {b}관(본관) {room}호"
+    if kind == 2:
+        return f"{d1}({start:02d}:00~{start + 1:02d}:15) / {b}관 {room}호 / {d2}3,4 / 203호"
+    if kind == 3:
+        return f"{d1}3,4 / {b}관 {room}호"
+    if kind == 4:
+        return f"{d1}{start}:00~{start + 1}:15 / {b}관 {room}호"
+    if kind == 5:
+        return f"{d1}5,6, {d2}7 / {b}관 {room}호 / {rnd.choice(buildings)}관 B101호"
+    if kind == 6:
+        return None  # 시간 미정 (빈 칸)
+    return "미정"
+
+
+def schedule_strings(count: int, buildings: List[int], seed: int = 0) -> List[str]:
+    rnd = random.Random(seed)
+    return [s for s in (schedule_string(rnd, buildings) for _ in range(count)) if s is not None]
+
+
+def registrar_rows(count: int, buildings: List[int], seed: int = 0) -> List[Dict[str, Any]]:
+    """학사 시스템 엑셀(과목번호-분반, 과목명, 담당교수, 폐강, 강의시간 + 기타 열) 행."""
+    rnd = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        rows.append({
+            "과목번호-분반": f"{rnd.randint(10000, 99999)}-0{rnd.randint(1, 5)}",
+            "과목명": f"과목{rnd.randint(1, 500)}",
+            "담당교수": rnd.choice(PROFESSORS[:-1] + (None,)),
+            "폐강": "폐강" if rnd.random() < 0.1 else None,
+            "강의시간": schedule_string(rnd, buildings),
+            "학점": rnd.choice((1, 2, 3)),
+        })
+    return rows
+
+
+def write_registrar_excel(path: str, count: int, buildings: List[int], seed: int = 0):
+    import pandas as pd  # data/excel_to_json 과 같은 의존성 (앱 런타임에는 필요 없음)
+    pd.DataFrame(registrar_rows(count, buildings, seed)).to_excel(path, index=False, engine="openpyxl")
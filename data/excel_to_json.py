@@ -1,8 +1,34 @@
 import pandas as pd
+import hashlib
 import os
 import re
 import json
+import shutil
+import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from data.manifest import empty_pending, file_sha256, new_manifest, read_manifest, write_manifest
+from utils.snapshot import write_snapshot
+
+# 강의시간 파싱용 정규식 (모듈 로드 시 1회 컴파일)
+SPLIT_PLAIN_TIME_RE = re.compile(r"([월화수목금토일]\d{1,2}:\d{2}~\d{1,2}:\d{2}),\s*")
+SPLIT_PERIODS_RE = re.compile(r"([월화수목금토일][\d,]+),\s*(?=[월화수목금토일])")
+PAREN_TIME_RE = re.compile(r"([월화수목금토일])\((\d{2}:\d{2})~(\d{2}:\d{2})\)")
+PLAIN_TIME_RE = re.compile(r"([월화수목금토일])(\d{1,2}:\d{2})~(\d{1,2}:\d{2})")
+DAY_PERIODS_RE = re.compile(r"([월화수목금토일])([\d,]*)")
+ROOM_FULL_RE = re.compile(r"(\d+)관.*?(B?\d+-?\d*)호")
+ROOM_PARTIAL_RE = re.compile(r"(B?\d+-?\d*)호")
+
+# 앱이 Mongo 장애 시 mmap 으로 읽는 바이너리 시간표 (utils/snapshot.py)
+SNAPSHOT_NAME = "lectures.snapshot"
+# 엑셀 파일별 파싱 결과 캐시 (증분 변환용, 매니페스트의 sha256 로 찾음)
+PARSED_DIR = ".parsed"
+
+# 같은 강의시간 문자열은 분반마다 반복되므로 파싱 결과를 캐시
+SCHEDULE_CACHE_SIZE = 8192
 
 def convert_period_to_time(period_num: int) -> str:
     base_hour = 8 if period_num == 0 else 9 + (period_num - 1)
@@ -13,12 +39,16 @@ def convert_period_to_time(period_num: int) -> str:
 def parse_schedule(schedule_str: str):
     if pd.isna(schedule_str):
         return None
+    # 캐시된 결과를 공유하지 않도록 호출마다 새 dict 로 복사
+    return [dict(item) for item in _parse_schedule_cached(schedule_str)]
 
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def _parse_schedule_cached(schedule_str: str) -> Tuple[Tuple[Tuple[str, Optional[str]], ...], ...]:
     # 예: 월13:30~14:45, 수13:30~14:45 → 월13:30~14:45 / 수13:30~14:45 로 분리
-    schedule_str = re.sub(r"([월화수목금토일]\d{1,2}:\d{2}~\d{1,2}:\d{2}),\s*", r"\1 / ", schedule_str)
+    schedule_str = SPLIT_PLAIN_TIME_RE.sub(r"\1 / ", schedule_str)
 
     # 예: 화0,1,2, 목0,1,2 → 화0,1,2 / 목0,1,2 로 분리
-    schedule_str = re.sub(r"([월화수목금토일][\d,]+),\s*(?=[월화수목금토일])", r"\1 / ", schedule_str)
+    schedule_str = SPLIT_PERIODS_RE.sub(r"\1 / ", schedule_str)
 
     parts = [p.strip() for p in schedule_str.split('/') if p.strip()]
     schedule_info = []
@@ -26,7 +56,7 @@ def parse_schedule(schedule_str: str):
 
     for part in parts:
         # ex: 화(15:00~16:15)
-        match_paren_time = re.match(r"([월화수목금토일])\((\d{2}:\d{2})~(\d{2}:\d{2})\)", part)
+        match_paren_time = PAREN_TIME_RE.match(part)
         if match_paren_time:
             schedule_info.append({
                 "day": match_paren_time.group(1),
@@ -36,7 +66,7 @@ def parse_schedule(schedule_str: str):
             continue
 
         # ex: 월13:30~14:45 → 괄호 없이 시간 표현된 경우
-        match_plain_time = re.match(r"([월화수목금토일])(\d{1,2}:\d{2})~(\d{1,2}:\d{2})", part)
+        match_plain_time = PLAIN_TIME_RE.match(part)
         if match_plain_time:
             schedule_info.append({
                 "day": match_plain_time.group(1),
@@ -46,7 +76,7 @@ def parse_schedule(schedule_str: str):
             continue
 
         # ex: 목3,4 — 교시 기반 시간 처리
-        match_day_periods = re.match(r"([월화수목금토일])([\d,]*)", part)
+        match_day_periods = DAY_PERIODS_RE.match(part)
         if match_day_periods:
             day = match_day_periods.group(1)
             period_str = match_day_periods.group(2)
@@ -67,8 +97,8 @@ def parse_schedule(schedule_str: str):
             continue
 
         # 강의실: 208관 B310호
-        match_room_full = re.search(r"(\d+)관.*?(B?\d+-?\d*)호", part)
-        match_room_partial = re.match(r"(B?\d+-?\d*)호", part)
+        match_room_full = ROOM_FULL_RE.search(part)
+        match_room_partial = ROOM_PARTIAL_RE.match(part)
 
         if match_room_full:
             building = match_room_full.group(1)
@@ -92,15 +122,15 @@ def parse_schedule(schedule_str: str):
         else:
             building, room = None, None
 
-        results.append({
-            "day": item["day"],
-            "start_time": item["start_time"],
-            "end_time": item["end_time"],
-            "building": building,
-            "room": room
-        })
+        results.append((
+            ("day", item["day"]),
+            ("start_time", item["start_time"]),
+            ("end_time", item["end_time"]),
+            ("building", building),
+            ("room", room),
+        ))
 
-    return results
+    return tuple(results)
 
 
 def process_excel_file(filepath: str) -> list[dict]:
@@ -109,15 +139,19 @@ def process_excel_file(filepath: str) -> list[dict]:
     df = df[df["폐강"].isna()].drop(columns=["폐강"])
     df["담당교수"] = df["담당교수"].fillna("미정")
 
+    # iterrows 대신 열 단위 리스트를 zip 으로 순회 (행마다 Series 생성 비용 제거)
     parsed_rows = []
-    for _, row in df.iterrows():
-        parsed = parse_schedule(row["강의시간"])
+    for course_id, course_name, professor, schedule in zip(
+        df["과목번호-분반"].tolist(), df["과목명"].tolist(),
+        df["담당교수"].tolist(), df["강의시간"].tolist(),
+    ):
+        parsed = parse_schedule(schedule)
         if parsed:
             for p in parsed:
                 parsed_rows.append({
-                    "course_id": row["과목번호-분반"],
-                    "course_name": row["과목명"],
-                    "professor": row["담당교수"],
+                    "course_id": course_id,
+                    "course_name": course_name,
+                    "professor": professor,
                     **p
                 })
 
@@ -141,29 +175,141 @@ def process_excel_file(filepath: str) -> list[dict]:
 
     return df.to_dict(orient="records")
 
-def convert_all_excels(raw_dir: str, save_dir: str):
-    os.makedirs(save_dir, exist_ok=True)
+def _building_file(building: int) -> str:
+    return f"{building}_lectures.json"
+
+def _parsed_path(parsed_dir: str, digest: str) -> str:
+    return os.path.join(parsed_dir, f"{digest}.json")
 
+def _parse_files(file_paths: List[str], max_workers: Optional[int]) -> List[list]:
+    if len(file_paths) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(process_excel_file, file_paths))
+    return [process_excel_file(path) for path in file_paths]
+
+def _clear_outputs(save_dir: str, parsed_dir: str):
     for f in os.listdir(save_dir):
         file_path = os.path.join(save_dir, f)
         if os.path.isfile(file_path):
             os.remove(file_path)
+    shutil.rmtree(parsed_dir, ignore_errors=True)
 
-    building_data = defaultdict(list)
+def _merge_pending(pending: Dict[str, Any], updated: Set[int], removed: Set[int]) -> Dict[str, Any]:
+    """아직 Mongo 에 반영하지 않은 이전 변경 목록에 이번 변경을 누적."""
+    if pending["full"]:
+        return pending
+    return {
+        "full": False,
+        "updated": sorted((set(pending["updated"]) - removed) | updated),
+        "removed": sorted((set(pending["removed"]) - updated) | removed),
+    }
+
+def convert_all_excels(raw_dir: str, save_dir: str, max_workers: Optional[int] = None,
+                       full: bool = False) -> Dict[str, Any]:
+    """
+    raw_dir 의 .xlsx 를 건물별 JSON 으로 변환하고, 같은 내용을 바이너리 스냅샷(SNAPSHOT_NAME)으로도 저장.
+    save_dir/manifest.json 에 입력 파일 해시를 기록해 두고, 다음 실행부터는 내용이 바뀐 엑셀만 다시 파싱하고
+    그 파일이 (이전에 또는 지금) 포함한 건물의 {building}_lectures.json 만 다시 쓴다.
+    파일별 파싱 결과는 save_dir/.parsed/{sha256}.json 에 보관해 바뀌지 않은 파일의 행을 재사용한다.
+    매니페스트가 없거나 full=True 면 save_dir 를 비우고 전부 변환한다.
+    파일 목록은 이름순으로 합쳐 증분/전체 변환 결과가 같다.
+    반환값은 Mongo 에 아직 반영하지 않은 변경 목록 (manifest 의 pending, data/manifest.py 참고).
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    parsed_dir = os.path.join(save_dir, PARSED_DIR)
+
+    manifest = None if full else read_manifest(save_dir)
+    if manifest is None:
+        full = True
+        _clear_outputs(save_dir, parsed_dir)
+        manifest = new_manifest()
+    os.makedirs(parsed_dir, exist_ok=True)
 
-    for filename in os.listdir(raw_dir):
-        if filename.endswith(".xlsx"):
-            file_path = os.path.join(raw_dir, filename)
-            lecture_list = process_excel_file(file_path)
-            for row in lecture_list:
-                building_data[row["building"]].append(row)
+    old_inputs: Dict[str, Any] = manifest["inputs"]
+    filenames = sorted(f for f in os.listdir(raw_dir) if f.endswith(".xlsx"))
+    hashes = {f: file_sha256(os.path.join(raw_dir, f)) for f in filenames}
 
-    for building, records in building_data.items():
-        save_name = f"{building}_lectures.json"
+    changed = [
+        f for f in filenames
+        if old_inputs.get(f, {}).get("sha256") != hashes[f]
+        or not os.path.exists(_parsed_path(parsed_dir, hashes[f]))
+    ]
+    dropped = [f for f in old_inputs if f not in hashes]
+    if not changed and not dropped:
+        print("변경된 엑셀 파일 없음")
+        return manifest["pending"]
+
+    records_by_file: Dict[str, list] = dict(
+        zip(changed, _parse_files([os.path.join(raw_dir, f) for f in changed], max_workers))
+    )
+    for f in changed:
+        with open(_parsed_path(parsed_dir, hashes[f]), "w", encoding="utf-8") as out:
+            json.dump(records_by_file[f], out, ensure_ascii=False)
+        print(f"{f} 파싱 완료 ({len(records_by_file[f])}개 강의)")
+
+    # 바뀐/사라진 파일이 이전에 포함했거나 지금 포함하는 건물만 다시 쓴다
+    affected: Set[int] = set()
+    for f in changed + dropped:
+        affected.update(old_inputs.get(f, {}).get("buildings", []))
+    for f in changed:
+        affected.update(row["building"] for row in records_by_file[f])
+
+    # 다른 파일의 행은 파싱 캐시에서 읽음 (스냅샷은 전체 강의로 다시 만든다)
+    for f in filenames:
+        if f not in records_by_file:
+            with open(_parsed_path(parsed_dir, hashes[f]), "r", encoding="utf-8") as cached:
+                records_by_file[f] = json.load(cached)
+
+    building_data = defaultdict(list)
+    for f in filenames:
+        for row in records_by_file[f]:
+            building_data[row["building"]].append(row)
+
+    outputs: Dict[str, str] = manifest["outputs"]
+    updated: Set[int] = set()
+    removed: Set[int] = set()
+    for building in sorted(affected):
+        save_name = _building_file(building)
         save_path = os.path.join(save_dir, save_name)
+        records = building_data.get(building)
+        if not records:
+            if os.path.exists(save_path):
+                os.remove(save_path)
+            outputs.pop(str(building), None)
+            removed.add(building)
+            print(f"{building}번 건물 → {save_name} 삭제")
+            continue
+
+        text = json.dumps(records, ensure_ascii=False, indent=2)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if outputs.get(str(building)) == digest and os.path.exists(save_path):
+            continue  # 엑셀은 바뀌었지만 이 건물의 결과는 그대로
         with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(records, f, ensure_ascii=False, indent=2)
+            f.write(text)
+        outputs[str(building)] = digest
+        updated.add(building)
         print(f"{building}번 건물 → {save_name} 저장 완료")
 
+    if updated or removed or full:
+        snapshot_path = os.path.join(save_dir, SNAPSHOT_NAME)
+        lectures = [row for records in building_data.values() for row in records]
+        write_snapshot(snapshot_path, lectures)
+        print(f"바이너리 스냅샷 → {SNAPSHOT_NAME} 저장 완료 ({len(lectures)}개 강의)")
+
+    # 더 이상 쓰이지 않는 파싱 캐시 정리
+    live = {f"{digest}.json" for digest in hashes.values()}
+    for name in os.listdir(parsed_dir):
+        if name not in live:
+            os.remove(os.path.join(parsed_dir, name))
+
+    manifest["inputs"] = {
+        f: {"sha256": hashes[f], "buildings": sorted({row["building"] for row in records_by_file[f]})}
+        for f in filenames
+    }
+    manifest["pending"] = empty_pending(full=True) if full else _merge_pending(manifest["pending"], updated, removed)
+    write_manifest(save_dir, manifest)
+    return manifest["pending"]
+
+# 실행 예시 (저장소 루트에서: python -m data.excel_to_json [--full])
 if __name__ == "__main__":
-    convert_all_excels("raw_data", "converted_data")
\ No newline at end of file
+    convert_all_excels("raw_data", "converted_data", full="--full" in sys.argv[1:])
\ No newline at end of file
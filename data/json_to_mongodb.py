@@ -1,40 +1,155 @@
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from pymongo import DeleteMany, InsertOne
+from data.manifest import clear_pending, read_manifest
+from db.mongo import create_sync_client, ROOMS_COLL
+from utils.room_utils import room_catalog_doc
+from utils.time_utils import lecture_minutes
+from collections import Counter
+from typing import Iterable
 import os
 import json
+import sys
 
-def insert_building_jsons_to_mongo(json_dir: str, collection_name: str):
+BULK_BATCH_SIZE = 5000
+LECTURE_INDEX = [("building", 1), ("room", 1), ("day", 1), ("start_min", 1)]
+CATALOG_INDEXES = [
+    ([("building", 1), ("floor", 1), ("sort_key", 1)], {}),
+    ([("building", 1), ("room", 1)], {"unique": True}),
+]
+
+BUILDING_JSON_SUFFIX = "_lectures.json"
+
+def load_building_json(file_path: str) -> list:
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        return []
+    # "HH:MM" 문자열과 함께 자정 기준 정수 분(start_min/end_min)도 저장
+    for lec in data:
+        lec["start_min"], lec["end_min"] = lecture_minutes(lec)
+    print(f"{os.path.basename(file_path)} → {len(data)}개 읽음")
+    return data
+
+def load_building_jsons(json_dir: str) -> list:
+    """json_dir 의 {building}_lectures.json 파일을 모두 읽어 하나의 리스트로 반환."""
+    lectures = []
+    for filename in os.listdir(json_dir):
+        if filename.endswith(BUILDING_JSON_SUFFIX):
+            lectures.extend(load_building_json(os.path.join(json_dir, filename)))
+    return lectures
+
+def swap_in_collection(db, collection_name: str, docs: list, indexes: list):
+    """
+    docs 를 섀도 컬렉션에 대량 적재하고 인덱스/건수를 검증한 뒤 renameCollection 으로 원자적 교체.
+    교체 전까지 기존 컬렉션은 그대로이므로 읽는 쪽은 절반만 적재된 데이터를 보지 않는다.
+    """
+    shadow_name = f"{collection_name}__shadow"
+    db.drop_collection(shadow_name)
+    shadow = db[shadow_name]
+
+    for i in range(0, len(docs), BULK_BATCH_SIZE):
+        shadow.insert_many(docs[i:i + BULK_BATCH_SIZE], ordered=False)
+
+    for keys, options in indexes:
+        shadow.create_index(keys, **options)
+
+    # 건물별 건수 검증
+    expected = Counter(doc["building"] for doc in docs)
+    actual = {
+        row["_id"]: row["count"]
+        for row in shadow.aggregate([{"$group": {"_id": "$building", "count": {"$sum": 1}}}])
+    }
+    if actual != dict(expected):
+        db.drop_collection(shadow_name)
+        raise RuntimeError(f"{shadow_name} 건수 검증 실패: expected={dict(expected)} actual={actual}")
+
+    db.client.admin.command(
+        "renameCollection", f"{db.name}.{shadow_name}",
+        to=f"{db.name}.{collection_name}", dropTarget=True,
+    )
+    print(f"{collection_name} 컬렉션 교체 완료 ({len(docs)}개)")
+
+def rebuild_room_catalog(db, lectures: list, catalog_name: str = ROOMS_COLL):
+    """
+    강의 데이터에 등장하는 (건물, 강의실)로 강의실 카탈로그를 다시 만든다.
+    /api/rooms 의 방 목록은 (building, floor, sort_key) 인덱스를 타는 정렬된 조회가 된다.
+    """
+    pairs = {(lec["building"], lec["room"]) for lec in lectures}
+    docs = [room_catalog_doc(building, room) for building, room in sorted(pairs)]
+    swap_in_collection(db, catalog_name, docs, CATALOG_INDEXES)
+
+def replace_buildings(db, collection_name: str, json_dir: str,
+                      updated: Iterable[int], removed: Iterable[int],
+                      catalog_name: str = ROOMS_COLL):
+    """
+    excel_to_json 이 넘긴 변경 목록대로 건물 단위로만 강의/강의실 카탈로그를 교체.
+    삭제(DeleteMany)와 첫 배치 삽입을 순서 있는 bulk_write 하나로 보내므로 해당 건물이 비어 보이는 구간은
+    그 요청 동안뿐이고, 다른 건물은 영향이 없다.
+    """
+    lectures_coll = db[collection_name]
+    catalog = db[catalog_name]
+    lectures_coll.create_index(LECTURE_INDEX)
+    for keys, options in CATALOG_INDEXES:
+        catalog.create_index(keys, **options)
+
+    for building in removed:
+        lectures_coll.delete_many({"building": building})
+        catalog.delete_many({"building": building})
+        print(f"{building}번 건물 삭제")
+
+    for building in updated:
+        lectures = load_building_json(os.path.join(json_dir, f"{building}{BUILDING_JSON_SUFFIX}"))
+        for i in range(0, len(lectures), BULK_BATCH_SIZE):
+            ops = [InsertOne(lec) for lec in lectures[i:i + BULK_BATCH_SIZE]]
+            if i == 0:
+                ops.insert(0, DeleteMany({"building": building}))
+            lectures_coll.bulk_write(ops, ordered=True)
+
+        rooms = sorted({lec["room"] for lec in lectures})
+        catalog.bulk_write(
+            [DeleteMany({"building": building})]
+            + [InsertOne(room_catalog_doc(building, room)) for room in rooms],
+            ordered=True,
+        )
+        print(f"{building}번 건물 교체 완료 ({len(lectures)}개 강의, {len(rooms)}개 강의실)")
+
+def insert_building_jsons_to_mongo(json_dir: str, collection_name: str, full: bool = False):
+    """
+    json_dir/manifest.json 에 쌓인 변경 목록(pending)이 있으면 바뀐 건물만 교체하고,
+    매니페스트가 없거나 전체 변환 직후(full)면 섀도 컬렉션으로 전체를 교체한다.
+    """
     load_dotenv()
-    mongo_uri = os.getenv("MONGODB_URI")
 
-    if not mongo_uri:
-        raise ValueError("MONGODB_URI가 .env에 정의되어 있지 않습니다.")
+    manifest = None if full else read_manifest(json_dir)
+    pending = manifest["pending"] if manifest is not None else None
+    if pending is not None and not pending["full"] and not pending["updated"] and not pending["removed"]:
+        print("반영할 변경 사항 없음")
+        return
 
     # DB 이름이 URI에 포함된 경우 → get_default_database() 사용
-    client = MongoClient(mongo_uri)
+    client = create_sync_client()
     db = client.get_default_database()
-    collection = db[collection_name]
 
-    # 기존 데이터 전체 삭제
-    collection.delete_many({})
-    print(f"기존 {collection_name} 컬렉션 데이터 전체 삭제 완료")
+    if pending is not None and not pending["full"]:
+        replace_buildings(db, collection_name, json_dir, pending["updated"], pending["removed"])
+    else:
+        lectures = load_building_jsons(json_dir)
+        if not lectures:
+            raise ValueError(f"{json_dir} 에 적재할 강의 데이터가 없습니다.")
 
-    inserted_count = 0
-    for filename in os.listdir(json_dir):
-        if filename.endswith(".json"):
-            file_path = os.path.join(json_dir, filename)
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    collection.insert_many(data)
-                    inserted_count += len(data)
-                    print(f"{filename} → {len(data)}개 삽입 완료")
-
-    print(f"총 {inserted_count}개 강의가 {collection_name} 컬렉션에 저장되었습니다.")
-
-# 실행 예시
+        # 기존 컬렉션은 교체 직전까지 그대로 유지
+        swap_in_collection(db, collection_name, lectures, [(LECTURE_INDEX, {})])
+        print(f"총 {len(lectures)}개 강의가 {collection_name} 컬렉션에 저장되었습니다.")
+
+        rebuild_room_catalog(db, lectures)
+
+    clear_pending(json_dir)
+    client.close()
+
+# 실행 예시 (저장소 루트에서: python -m data.json_to_mongodb [--full])
 if __name__ == "__main__":
     insert_building_jsons_to_mongo(
         json_dir="converted_data",
-        collection_name="2025_2_lectures"
-    )
\ No newline at end of file
+        collection_name="2025_2_lectures",
+        full="--full" in sys.argv[1:],
+    )
@@ -0,0 +1,66 @@
+"""
+converted_data/manifest.json — excel_to_json 의 증분 변환 상태와, 아직 Mongo 에 반영하지 않은 변경 목록.
+
+{
+  "version": 1,
+  "inputs":  {"<엑셀 파일명>": {"sha256": "...", "buildings": [208, 310]}},
+  "outputs": {"<건물>": "<{건물}_lectures.json 의 sha256>"},
+  "pending": {"full": false, "updated": [208], "removed": []}
+}
+
+pending 은 변환을 여러 번 돌려도 누적되고, json_to_mongodb 가 반영한 뒤 비운다.
+"""
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def empty_pending(full: bool = False) -> Dict[str, Any]:
+    return {"full": full, "updated": [], "removed": []}
+
+
+def new_manifest() -> Dict[str, Any]:
+    return {"version": MANIFEST_VERSION, "inputs": {}, "outputs": {}, "pending": empty_pending()}
+
+
+def read_manifest(save_dir: str) -> Optional[Dict[str, Any]]:
+    """없거나 버전이 다르면 None (→ 전체 변환/전체 적재)."""
+    path = os.path.join(save_dir, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(save_dir: str, manifest: Dict[str, Any]):
+    path = os.path.join(save_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def clear_pending(save_dir: str):
+    """Mongo 반영이 끝난 뒤 호출. 매니페스트가 없으면 아무것도 하지 않음."""
+    manifest = read_manifest(save_dir)
+    if manifest is not None:
+        manifest["pending"] = empty_pending()
+        write_manifest(save_dir, manifest)
@@ -0,0 +1,43 @@
+from dotenv import load_dotenv
+from db.mongo import create_sync_client, LECTURES_COLL
+from data.json_to_mongodb import LECTURE_INDEX
+
+def _hhmm_to_minutes(field: str) -> dict:
+    """'HH:MM' (또는 'H:MM') 문자열 필드를 자정 기준 분으로 바꾸는 집계 식."""
+    return {
+        "$let": {
+            "vars": {"p": {"$split": [f"${field}", ":"]}},
+            "in": {
+                "$add": [
+                    {"$multiply": [{"$toInt": {"$arrayElemAt": ["$$p", 0]}}, 60]},
+                    {"$toInt": {"$arrayElemAt": ["$$p", 1]}},
+                ]
+            },
+        }
+    }
+
+def migrate_minutes(collection_name: str = LECTURES_COLL):
+    """
+    기존 강의 컬렉션에 start_min/end_min 정수 필드를 채우고 정수 기반 인덱스를 만든다.
+    서버 측 파이프라인 업데이트 한 번으로 처리하며, 이미 채워진 도큐먼트는 건너뛴다.
+    """
+    load_dotenv()
+    client = create_sync_client()
+    collection = client.get_default_database()[collection_name]
+
+    result = collection.update_many(
+        {"$or": [{"start_min": {"$exists": False}}, {"end_min": {"$exists": False}}]},
+        [{"$set": {
+            "start_min": _hhmm_to_minutes("start_time"),
+            "end_min": _hhmm_to_minutes("end_time"),
+        }}],
+    )
+    print(f"{collection_name}: {result.modified_count}개 도큐먼트에 start_min/end_min 추가")
+
+    collection.create_index(LECTURE_INDEX)
+    print(f"{collection_name}: {LECTURE_INDEX} 인덱스 확인/생성 완료")
+    client.close()
+
+# 실행 예시 (저장소 루트에서: python -m data.migrate_minutes)
+if __name__ == "__main__":
+    migrate_minutes()
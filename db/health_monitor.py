@@ -0,0 +1,121 @@
+from collections import deque
+from fastapi import Request
+from typing import Any, Deque, Dict, List, Optional
+import asyncio
+import time
+
+from db.mongo import MongoManager
+
+# 지연 히스토그램 버킷 상한(ms). 마지막 버킷은 그 이상 전부
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+class HealthMonitor:
+    """
+    interval 초마다 Mongo 에 ping 을 보내고 최근 window 개 결과를 보관.
+    /health, /ready 는 요청마다 ping 하지 않고 이 상태만 읽는다.
+    """
+
+    def __init__(self, mongo: MongoManager,
+                 interval: float = 10.0,
+                 window: int = 60,
+                 timeout: float = 2.0,
+                 degraded_ms: float = 500.0):
+        self.mongo = mongo
+        self.interval = interval
+        self.timeout = timeout
+        self.degraded_ms = degraded_ms
+        self._latencies: Deque[float] = deque(maxlen=window)  # 성공한 probe 의 지연(ms)
+        self._task: Optional[asyncio.Task] = None
+
+        self.probes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_success: Optional[float] = None  # time.time()
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def probe(self):
+        self.probes += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self.mongo.database.command("ping"), self.timeout)
+            if result.get("ok") != 1:
+                raise RuntimeError(f"ping returned {result}")
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            return
+        self._latencies.append((time.perf_counter() - started) * 1000)
+        self.consecutive_failures = 0
+        self.last_success = time.time()
+
+    async def _run(self):
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    @property
+    def mongodb_status(self) -> str:
+        if self.probes == 0:
+            return "unknown"
+        return "fail" if self.consecutive_failures else "ok"
+
+    def _percentile(self, values: List[float], q: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    def latency(self) -> Dict[str, Any]:
+        values = list(self._latencies)
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for v in values:
+            i = next((i for i, b in enumerate(LATENCY_BUCKETS_MS) if v <= b), len(LATENCY_BUCKETS_MS))
+            counts[i] += 1
+        labels = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "samples": len(values),
+            "last_ms": round(values[-1], 2) if values else None,
+            "p50_ms": self._percentile(values, 0.5),
+            "p95_ms": self._percentile(values, 0.95),
+            "histogram": dict(zip(labels, counts)),
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        ready: 최근 probe 성공 + p95 지연 < degraded_ms
+        degraded: 최근 probe 실패, 마지막 성공이 오래됨(interval 3회 이상), 또는 지연 임계 초과
+        """
+        reasons = []
+        if self.last_success is None:
+            reasons.append("no successful probe yet")
+        elif time.time() - self.last_success > self.interval * 3:
+            reasons.append("last successful probe is stale")
+        if self.consecutive_failures:
+            reasons.append(f"{self.consecutive_failures} consecutive probe failures")
+        p95 = self._percentile(list(self._latencies), 0.95)
+        if p95 is not None and p95 >= self.degraded_ms:
+            reasons.append(f"p95 ping latency {p95}ms >= {self.degraded_ms}ms")
+        return {"status": "degraded" if reasons else "ready", "reasons": reasons}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.mongodb_status,
+            "probes": self.probes,
+            "failures": self.failures,
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "latency": self.latency(),
+        }
+
+
+def get_health_monitor(request: Request) -> HealthMonitor:
+    return request.app.health_monitor
@@ -1,7 +1,228 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
+from fastapi import HTTPException, Request, status
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+from typing import Any, Dict, Optional
+import threading
+import time
 import os
 
-def get_database():
+from utils.metrics import MONGO_COMMANDS, MONGO_COMMAND_SECONDS, MONGO_DOCUMENTS
+
+LECTURES_COLL = "2025_2_lectures"
+ROOMS_COLL = "2025_2_rooms"  # 강의실 카탈로그 (building, room, floor, sort_key)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def client_options() -> Dict[str, Any]:
+    """앱(Motor)과 데이터 스크립트(PyMongo)가 공유하는 커넥션 풀 설정."""
+    return {
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 20),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", 300_000),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5_000),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 5_000),
+    }
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """pymongo 커넥션 풀 이벤트를 세어 두는 리스너."""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # 이벤트는 pymongo 워커 스레드에서도 호출됨
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+        self.pool_cleared = 0
+
+    def _incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+    def pool_cleared(self, event): self._incr("pool_cleared")
+    def connection_created(self, event): self._incr("created")
+    def connection_closed(self, event): self._incr("closed")
+    def connection_checked_out(self, event): self._incr("checked_out")
+    def connection_checked_in(self, event): self._incr("checked_in")
+    def connection_check_out_failed(self, event): self._incr("checkout_failed")
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": self.created - self.closed,
+                "in_use": self.checked_out - self.checked_in,
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checked_out,
+                "checkout_failed": self.checkout_failed,
+                "pool_cleared": self.pool_cleared,
+            }
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold 에 도달하면 cooldown 동안 DB 요청을 바로 거절(open).
+    cooldown 이 지나면 한 요청만 시험으로 흘려보내고(half_open), 성공하면 닫힘(closed), 실패하면 다시 open.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float = 0.0
+        # half_open 에서 시험 중인 요청의 시작 시각 (그 요청만 통과, 결과가 기록되면 None)
+        self.probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.threshold:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state != "half_open":
+            return state == "closed"
+        # 회복 중인 primary 에 한꺼번에 몰리지 않도록 half_open 에서는 한 요청만 시험.
+        # 시험 요청이 결과를 남기지 못하고 사라졌으면(취소 등) cooldown 뒤 다른 요청이 이어받는다
+        now = time.monotonic()
+        if self.probe_started is not None and now - self.probe_started < self.cooldown:
+            return False
+        self.probe_started = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self.probe_started = None
+
+    def release(self):
+        """DB 와 무관한 이유로 끝난 요청. 시험 중이었다면 다음 요청이 시험할 수 있게 한다."""
+        self.probe_started = None
+
+    def retry_after(self) -> int:
+        return max(1, int(self.cooldown - (time.monotonic() - self.opened_at)))
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """명령별 횟수/지연/반환 도큐먼트 수를 utils.metrics 카운터에 기록 (/metrics)."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        name = event.command_name
+        MONGO_COMMANDS.inc(name, "success")
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, name)
+        reply = event.reply
+        cursor = reply.get("cursor")
+        if cursor is not None:
+            batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+            if batch:
+                MONGO_DOCUMENTS.inc(name, amount=len(batch))
+        elif name == "distinct":
+            MONGO_DOCUMENTS.inc(name, amount=len(reply.get("values", ())))
+
+    def failed(self, event):
+        MONGO_COMMANDS.inc(event.command_name, "failure")
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, event.command_name)
+
+
+class MongoManager:
+    """
+    앱 전체에서 하나만 만들어 쓰는 Motor 클라이언트 + 풀 설정 + 서킷 브레이커.
+    main.lifespan 에서 생성하여 app.mongo 로 보관.
+    """
+
+    def __init__(self, uri: Optional[str] = None):
+        self.pool_stats = PoolStats()
+        self.client = AsyncIOMotorClient(
+            uri or os.getenv("MONGODB_URI"),
+            event_listeners=[self.pool_stats, CommandMetrics()],
+            **client_options(),
+        )
+        self.database: AsyncIOMotorDatabase = self.client.get_default_database()
+        # 쿼리별 서버 실행 시간 제한 (find/aggregate 의 max_time_ms 로 전달)
+        self.max_time_ms = _env_int("MONGO_MAX_TIME_MS", 3_000)
+        self.breaker = CircuitBreaker(
+            threshold=_env_int("MONGO_BREAKER_THRESHOLD", 5),
+            cooldown=float(_env_int("MONGO_BREAKER_COOLDOWN", 30)),
+        )
+        # 강의 도큐먼트에 start_min/end_min 이 채워져 있는지 (main.lifespan 의 check_minute_fields 가 갱신).
+        # False 면 정수 필드에 의존하는 Mongo 경로(정렬/집계)를 쓰지 않는다
+        self.minutes_migrated = True
+
+    def stats(self) -> Dict[str, Any]:
+        options = self.client.options.pool_options
+        return {
+            **self.pool_stats.snapshot(),
+            "min_pool_size": options.min_pool_size,
+            "max_pool_size": options.max_pool_size,
+            "breaker": self.breaker.state,
+        }
+
+    def close(self):
+        self.client.close()
+
+
+def create_sync_client() -> MongoClient:
+    """데이터 적재 스크립트용 PyMongo 클라이언트. 앱과 같은 풀/타임아웃 설정을 사용."""
     mongo_uri = os.getenv("MONGODB_URI")
-    client = AsyncIOMotorClient(mongo_uri)
-    return client.get_default_database()
\ No newline at end of file
+    if not mongo_uri:
+        raise ValueError("MONGODB_URI가 .env에 정의되어 있지 않습니다.")
+    return MongoClient(mongo_uri, **client_options())
+
+
+def get_mongo(request: Request) -> MongoManager:
+    return request.app.mongo
+
+
+@asynccontextmanager
+async def guarded_database(mongo: MongoManager):
+    """
+    브레이커를 거쳐 DB 를 쓰는 구간.
+    브레이커가 열려 있으면 503, 구간 안에서 PyMongoError 가 나면 실패로 기록.
+    """
+    if not mongo.breaker.allow():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="database temporarily unavailable",
+            headers={"Retry-After": str(mongo.breaker.retry_after())},
+        )
+    try:
+        yield mongo.database
+    except PyMongoError:
+        mongo.breaker.record_failure()
+        raise
+    except BaseException:
+        # 400/404 같은 HTTPException, 취소 등
+        mongo.breaker.release()
+        raise
+    else:
+        mongo.breaker.record_success()
+
+
+async def get_database(request: Request):
+    """라우터에 주입하는 DB 의존성 (guarded_database 참고)."""
+    async with guarded_database(request.app.mongo) as database:
+        yield database
@@ -0,0 +1,145 @@
+from fastapi import Request
+from pymongo.errors import BulkWriteError, PyMongoError
+from typing import Any, Dict, List, Optional
+import asyncio
+
+DUPLICATE_KEY = 11000
+
+
+class BatchWriter:
+    """
+    write-behind 큐. 도큐먼트를 받아 두었다가 max_batch 개가 모이거나 flush_interval 초가 지나면
+    insert_many(ordered=False) 로 한 번에 기록한다.
+    - 연결 끊김/타임아웃 등 일시적 장애는 기록될 때까지 같은 배치를 재시도 (backoff 는 max_backoff 초까지).
+      그동안 새 도큐먼트는 큐에 쌓이고, 큐가 max_pending 개로 차면 submit 이 asyncio.QueueFull 을 던진다
+      (호출 측에서 503 처리). 즉 201 을 받은 도큐먼트는 재시도로도 안 되는 경우에만 버린다
+    - 버리는 경우: 도큐먼트 단위 쓰기 오류(검증 실패 등), 인코딩할 수 없는 도큐먼트(InvalidDocument 등)
+    - drain() 은 새 요청을 막고 남은 도큐먼트를 모두 기록한 뒤 종료 (시간 초과 시 남은 건수를 로그)
+    """
+
+    def __init__(self, collection,
+                 max_batch: int = 100,
+                 flush_interval: float = 0.5,
+                 max_pending: int = 1000,
+                 base_backoff: float = 0.5,
+                 max_backoff: float = 10.0):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = True
+
+        self.flushed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.retries = 0
+        self._inflight = 0  # 기록 중(재시도 중 포함)인 배치 크기
+        # 아직 기록되지 않은 도큐먼트의 _id → created_at (증분 내보내기가 이보다 앞에서 끊도록)
+        self._unwritten: Dict[Any, Any] = {}
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, doc: Dict[str, Any]):
+        """도큐먼트를 큐에 넣는다. _id 는 호출 측에서 미리 채워 두어야 응답에 쓸 수 있다."""
+        if not self._accepting:
+            self.rejected += 1
+            raise asyncio.QueueFull()
+        try:
+            self._queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        self._unwritten[doc["_id"]] = doc.get("created_at")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self._inflight = len(batch)
+            try:
+                await self._flush(batch)
+            finally:
+                self._inflight = 0
+                for doc in batch:
+                    self._unwritten.pop(doc["_id"], None)
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        attempt = 0
+        while True:
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                self.flushed += len(batch)
+                return
+            except BulkWriteError as e:
+                # ordered=False 이므로 나머지는 기록됨. 도큐먼트 단위 오류는 재시도해도 같으므로 버린다
+                self._count_write_errors(batch, e.details.get("writeErrors", []))
+                return
+            except PyMongoError as e:
+                # 연결/선출/타임아웃 등: 기록될 때까지 같은 배치를 재시도 (앞선 시도에서 일부가 기록됐다면
+                # 다음 시도에서 중복키로 돌아오고, _count_write_errors 가 기록된 것으로 센다)
+                attempt += 1
+                self.retries += 1
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1))
+                print(f"피드백 일괄 저장 실패 ({attempt}회째, {delay:.1f}초 후 재시도, {len(batch)}건):", e)
+                await asyncio.sleep(delay)
+            except Exception as e:
+                # InvalidDocument 등 도큐먼트 자체의 문제. 한 건씩 다시 기록해 문제 있는 도큐먼트만 버린다
+                if len(batch) > 1:
+                    for doc in batch:
+                        await self._flush([doc])
+                    return
+                self.failed += 1
+                print(f"피드백 저장 불가로 버림 ({type(e).__name__}: {e}):", str(batch[0].get("_id")))
+                return
+
+    def _count_write_errors(self, batch: List[Dict[str, Any]], write_errors: List[Dict[str, Any]]):
+        # 중복키(11000)는 이전 시도에서 이미 기록된 도큐먼트 (_id 를 submit 전에 발급하므로)
+        dropped = [err for err in write_errors if err.get("code") != DUPLICATE_KEY]
+        self.flushed += len(batch) - len(dropped)
+        self.failed += len(dropped)
+        if dropped:
+            print(f"피드백 일괄 저장 일부 실패로 {len(dropped)}건 버림:",
+                  [(str(batch[err["index"]].get("_id")), err.get("code")) for err in dropped])
+
+    async def drain(self, timeout: float = 10.0):
+        """새 요청을 막고 큐를 비운 뒤 백그라운드 작업을 종료."""
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"피드백 큐 비우기 시간 초과 (기록 못 한 {self._queue.qsize() + self._inflight}건)")
+        if self._task:
+            self._task.cancel()
+
+    def oldest_unwritten(self) -> Optional[Any]:
+        """큐에 있거나 기록(재시도) 중인 도큐먼트 중 가장 이른 created_at. 없으면 None."""
+        times = [t for t in self._unwritten.values() if t is not None]
+        return min(times) if times else None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self._queue.qsize(),
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "retries": self.retries,
+        }
+
+
+def get_feedback_writer(request: Request) -> Optional[BatchWriter]:
+    return getattr(request.app, "feedback_writer", None)
@@ -1,43 +1,179 @@
 from fastapi import FastAPI
-from routes.rooms import router as rooms_router
+from routes.rooms import router as rooms_router, build_room_statuses, SOON_THRESHOLD
 from routes.health import health_router
 from routes.timetable import router as timetable_router
-from routes.feedback import router as feedback_router
+from routes.feedback import router as feedback_router, COLL_NAME as FEEDBACK_COLL
+from routes.admin import admin_router
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
+from db.mongo import LECTURES_COLL, ROOMS_COLL, MongoManager
+from db.write_buffer import BatchWriter
+from db.health_monitor import HealthMonitor
+from utils.occupancy import OccupancyIndex, DEFAULT_TTL_SECONDS, SNAPSHOT_RETRY_SECONDS
+from utils.response_cache import RoomStatusCache, DEFAULT_MAX_ENTRIES
+from utils.live_status import RoomStatusBroadcaster
+from utils.snapshot import load_index_from_snapshot
+from utils.shared_occupancy import SharedOccupancy
+from utils.single_flight import SingleFlight
+from utils.export_jobs import ExportJobManager, DEFAULT_MAX_ARTIFACTS
+from utils.metrics import MetricsMiddleware
+from utils.profiling import ProfileRing, ProfilingMiddleware
+from functools import partial
+from pymongo.errors import PyMongoError
+import asyncio
 import os
 
 load_dotenv()
 
-MONGODB_URI = os.getenv("MONGODB_URI")
+OCCUPANCY_INDEX_TTL = float(os.getenv("OCCUPANCY_INDEX_TTL", DEFAULT_TTL_SECONDS))
+ROOM_CACHE_MAX_ENTRIES = int(os.getenv("ROOM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1000))
+# 피드백 write-behind 큐 (기본 꺼짐)
+FEEDBACK_WRITE_BEHIND = os.getenv("FEEDBACK_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+# data/excel_to_json.py 가 만든 바이너리 시간표. Mongo 에 연결할 수 없을 때 이걸로 기동
+TIMETABLE_SNAPSHOT = os.getenv("TIMETABLE_SNAPSHOT", "converted_data/lectures.snapshot")
+# 여러 워커로 띄울 때 시간표/점유 행렬을 shared_memory 로 공유 (기본 꺼짐)
+OCCUPANCY_SHARED_MEMORY = os.getenv("OCCUPANCY_SHARED_MEMORY", "").lower() in ("1", "true", "yes")
+OCCUPANCY_SHM_NAME = os.getenv("OCCUPANCY_SHM_NAME", "vacant_room_occupancy")
+# 요청 프로파일링: 샘플링 비율(0~1) 또는 관리자 토큰 헤더. 둘 다 없으면 미들웨어를 붙이지 않음
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", 20))
+# 피드백 내보내기 작업 파일 위치(기본: 임시 디렉터리, 종료 시 삭제)와 보관 개수
+EXPORT_ARTIFACT_DIR = os.getenv("EXPORT_ARTIFACT_DIR") or None
+EXPORT_CACHE_MAX = int(os.getenv("EXPORT_CACHE_MAX", DEFAULT_MAX_ARTIFACTS))
+
+async def ensure_indexes(database):
+    """시간표/강의실/피드백 컬렉션 인덱스 확인/생성 (이미 있으면 그대로)."""
+    await database[LECTURES_COLL].create_index(
+        [("building", 1), ("room", 1), ("day", 1), ("start_min", 1)]
+    )
+    await database[ROOMS_COLL].create_index(
+        [("building", 1), ("floor", 1), ("sort_key", 1)]
+    )
+    print("timetable 인덱스 확인/생성 완료")
+
+    # 피드백 목록(keyset 페이지네이션)/증분 내보내기용
+    await database[FEEDBACK_COLL].create_index([("created_at", -1), ("_id", -1)])
+    await database[FEEDBACK_COLL].create_index([("category", 1), ("created_at", -1), ("_id", -1)])
+    print("feedback 인덱스 확인/생성 완료")
+
+async def check_minute_fields(database) -> bool:
+    """
+    강의 컬렉션에 start_min/end_min 이 모두 채워져 있는지 확인 (data/migrate_minutes.py 실행 여부).
+    빠진 도큐먼트가 있으면 크게 경고하고 False 를 반환한다.
+    """
+    missing = await database[LECTURES_COLL].find_one(
+        {"$or": [{"start_min": {"$exists": False}}, {"end_min": {"$exists": False}}]}, {"_id": 1}
+    )
+    if missing is None:
+        return True
+    print("!!! 경고: start_min/end_min 이 없는 강의 도큐먼트가 있습니다 (data/migrate_minutes.py 미실행). "
+          "시간표 조회는 start_time 기준으로 정렬하고, /api/rooms 집계 경로는 쓰지 않습니다.")
+    return False
+
+async def retry_ensure_indexes(mongo: MongoManager, interval: float = SNAPSHOT_RETRY_SECONDS):
+    """스냅샷으로 기동한 경우 Mongo 가 돌아올 때까지 인덱스 생성/필드 확인을 재시도 (성공하면 종료)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await ensure_indexes(mongo.database)
+            mongo.minutes_migrated = await check_minute_fields(mongo.database)
+            return
+        except PyMongoError as e:
+            print("인덱스 생성 재시도 실패:", e)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 앱 시작 시 MongoDB 연결
-    mongo_client = AsyncIOMotorClient(MONGODB_URI)
-    app.mongodb_client = mongo_client
-    app.database = mongo_client.get_default_database()
+    # 앱 시작 시 MongoDB 연결 (앱 전체가 공유하는 단일 커넥션 풀)
+    app.mongo = MongoManager()
+    app.database = app.mongo.database
+
+    app.occupancy_index = OccupancyIndex(ttl_seconds=OCCUPANCY_INDEX_TTL)
+    app.shared_occupancy = None
+    if OCCUPANCY_SHARED_MEMORY:
+        app.shared_occupancy = SharedOccupancy(app.occupancy_index, OCCUPANCY_SHM_NAME, OCCUPANCY_INDEX_TTL)
 
+    index_retry = None
     try:
         await app.database.command("ping")
         print("MongoDB 연결 성공")
 
-        # 인덱스 생성
-        await app.database["2025_2_lectures"].create_index(
-            [("building", 1), ("room", 1), ("day", 1), ("start_time", 1)]
-        )
-        print("timetable 인덱스 확인/생성 완료")
+        await ensure_indexes(app.database)
+        app.mongo.minutes_migrated = await check_minute_fields(app.database)
+
+        # 강의실 점유 인덱스 적재 (/api/rooms 는 이 인덱스로만 응답)
+        if app.shared_occupancy is not None:
+            # loader 워커만 Mongo 에서 읽고, 나머지는 공유 메모리에 붙는다
+            count = await app.shared_occupancy.load(app.database)
+        else:
+            count = await app.occupancy_index.refresh(app.database)
+        print(f"occupancy 인덱스 적재 완료 ({count}개 강의)")
 
-    except Exception as e:
+    except (PyMongoError, OSError) as e:
+        # 연결/조회 실패만 스냅샷으로 대체 (코드 오류는 그대로 기동 실패)
+        # OSError 에는 공유 메모리 적재 대기 시간 초과(TimeoutError)도 포함
         print("MongoDB 연결 실패:", e)
-        raise e
+        # 스냅샷이 있으면 그걸로 기동하고, Mongo 재적재는 refresher 가, 인덱스 생성/필드 확인은 index_retry 가 계속 시도
+        if not os.path.exists(TIMETABLE_SNAPSHOT):
+            raise e
+        count = load_index_from_snapshot(app.occupancy_index, TIMETABLE_SNAPSHOT)
+        print(f"바이너리 스냅샷으로 occupancy 인덱스 적재 ({count}개 강의, {TIMETABLE_SNAPSHOT})")
+        index_retry = asyncio.create_task(retry_ensure_indexes(app.mongo))
+
+    app.room_cache = RoomStatusCache(max_entries=ROOM_CACHE_MAX_ENTRIES)
+    app.single_flight = SingleFlight()
+    app.export_jobs = ExportJobManager(EXPORT_ARTIFACT_DIR, max_artifacts=EXPORT_CACHE_MAX)
+    app.room_broadcaster = RoomStatusBroadcaster(
+        app.occupancy_index,
+        partial(build_room_statuses, app.occupancy_index),
+        soon_threshold=SOON_THRESHOLD,
+    )
+
+    if app.shared_occupancy is not None:
+        refresher = asyncio.create_task(app.shared_occupancy.run(app.database))
+    else:
+        refresher = asyncio.create_task(app.occupancy_index.run_refresher(app.database))
+
+    # Mongo 상태 백그라운드 점검 (/health, /ready 는 이 결과만 읽음)
+    app.health_monitor = HealthMonitor(
+        app.mongo,
+        interval=float(os.getenv("HEALTH_PROBE_INTERVAL", 10)),
+        degraded_ms=float(os.getenv("HEALTH_DEGRADED_MS", 500)),
+    )
+    app.health_monitor.start()
+
+    app.feedback_writer = None
+    if FEEDBACK_WRITE_BEHIND:
+        app.feedback_writer = BatchWriter(
+            app.database[FEEDBACK_COLL],
+            max_batch=int(os.getenv("FEEDBACK_BATCH_SIZE", 100)),
+            flush_interval=float(os.getenv("FEEDBACK_FLUSH_INTERVAL", 0.5)),
+            max_pending=int(os.getenv("FEEDBACK_MAX_PENDING", 1000)),
+        )
+        app.feedback_writer.start()
+        print("피드백 write-behind 큐 시작")
 
     yield
 
+    refresher.cancel()
+    if index_retry is not None:
+        index_retry.cancel()
+    if app.shared_occupancy is not None:
+        app.shared_occupancy.stop()
+    app.room_broadcaster.stop()
+    app.health_monitor.stop()
+    await app.export_jobs.close()
+
+    # 남은 피드백을 모두 기록한 뒤 연결 해제
+    if app.feedback_writer is not None:
+        await app.feedback_writer.drain()
+        print("피드백 write-behind 큐 종료:", app.feedback_writer.stats())
+
     # 앱 종료 시 연결 해제
-    mongo_client.close()
+    app.mongo.close()
     print("MongoDB 연결 종료")
 
 app = FastAPI(lifespan=lifespan)
@@ -46,6 +182,31 @@ app.include_router(rooms_router, prefix="/api")
 app.include_router(health_router)
 app.include_router(timetable_router)
 app.include_router(feedback_router, prefix="/api")
+app.include_router(admin_router)
+
+# 응답 압축: brotli-asgi 가 있으면 br(미지원 클라이언트는 gzip), 없으면 gzip
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(
+        BrotliMiddleware,
+        minimum_size=COMPRESS_MIN_SIZE,
+        gzip_fallback=True,
+        excluded_handlers=[r"^/api/rooms/stream$"],  # SSE 는 압축 시 버퍼링되므로 제외
+    )
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+
+if PROFILE_SAMPLE_RATE > 0 or PROFILE_ADMIN_TOKEN:
+    app.profiles = ProfileRing(max_entries=PROFILE_RING_SIZE)
+    app.add_middleware(
+        ProfilingMiddleware,
+        ring=app.profiles,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        admin_token=PROFILE_ADMIN_TOKEN,
+    )
+
+# 라우트별 지연/Server-Timing. 압축 시간까지 포함하도록 압축 미들웨어 바깥에 둔다
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
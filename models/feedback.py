@@ -1,4 +1,5 @@
 from __future__ import annotations
+from datetime import datetime
 from typing import Optional, Literal
 from pydantic import BaseModel, EmailStr, field_validator, model_validator
 from typing_extensions import Annotated
@@ -7,6 +8,7 @@ import re
 
 Category = Literal["bug", "timetable", "feature", "other"]
 PageURL = Literal["/310", "/timetable", "/feedback", "/guide", "/about"]
+ExportFormat = Literal["xlsx", "csv", "ndjson"]
 
 NameStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=2, max_length=20)]
 MessageStr = Annotated[str, StringConstraints(min_length=5, max_length=2000)]
@@ -51,4 +53,9 @@ class FeedbackCreate(BaseModel):
 
 class FeedbackCreateResult(BaseModel):
     id: str
-    created_at: str
\ No newline at end of file
+    created_at: str
+
+class FeedbackExportJobCreate(BaseModel):
+    format: ExportFormat = "xlsx"
+    since: Optional[datetime] = None  # 이 시각 이후 피드백만
+    after: Optional[str] = None  # 이전 내보내기의 X-Feedback-After 이후 피드백만 (증분 내보내기)
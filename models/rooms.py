@@ -0,0 +1,22 @@
+from __future__ import annotations
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+MAX_BATCH_QUERIES = 100
+
+BUILDING_PATTERN = r"^\d+$"
+
+class RoomQuery(BaseModel):
+    building: str = Field(..., pattern=BUILDING_PATTERN, description="건물 번호 (숫자)")
+    weekday: str = Field(..., description='요일("월"~"일")')
+    hour: int = Field(..., ge=0, le=23)
+    minute: int = Field(..., ge=0, le=59)
+    floor: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """응답에서 결과를 찾을 때 쓰는 키. 예) '310|4|월|13:30'"""
+        return f"{self.building}|{self.floor or ''}|{self.weekday}|{self.hour:02d}:{self.minute:02d}"
+
+class RoomBatchRequest(BaseModel):
+    queries: List[RoomQuery] = Field(..., min_length=1, max_length=MAX_BATCH_QUERIES)
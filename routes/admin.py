@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
+from typing import Literal, Optional
+from utils.profiling import PROFILE_TOKEN_HEADER, ProfileRing, get_profile_ring, token_matches
+from utils.responses import ORJSONResponse
+import os
+
+admin_router = APIRouter(prefix="/admin", default_response_class=ORJSONResponse)
+
+ProfileFormat = Literal["pstats", "speedscope"]
+
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+
+def _header_bytes(request: Request, name: str) -> Optional[bytes]:
+    value = request.headers.get(name)
+    # Starlette 는 헤더를 latin-1 로 디코딩하므로 그대로 인코딩하면 원본 바이트
+    return value.encode("latin-1") if value is not None else None
+
+
+def require_admin(request: Request) -> ProfileRing:
+    """프로파일링이 켜져 있고 X-Profile-Token 이 PROFILE_ADMIN_TOKEN 과 같을 때만 통과 (아니면 404)."""
+    ring = get_profile_ring(request)
+    if ring is None or not token_matches(os.getenv("PROFILE_ADMIN_TOKEN"), _header_bytes(request, PROFILE_TOKEN_HEADER)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return ring
+
+
+def require_admin_token(request: Request):
+    """
+    개인정보가 담긴 관리자 API(피드백 목록/내보내기 작업)용.
+    ADMIN_TOKEN 이 설정되지 않았으면 API 자체를 끄고(404), X-Admin-Token 이 다르면 401.
+    """
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not token_matches(expected, _header_bytes(request, ADMIN_TOKEN_HEADER)):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid admin token")
+
+
+@admin_router.get("/profiles")
+async def list_profiles(ring: ProfileRing = Depends(require_admin)):
+    """최근 프로파일 목록 (최신순)."""
+    return {"profiles": ring.list()}
+
+
+@admin_router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: int,
+    format: ProfileFormat = Query("speedscope", description="pstats | speedscope"),
+    ring: ProfileRing = Depends(require_admin),
+):
+    """
+    - pstats: python -m pstats / snakeviz 로 열 수 있는 바이너리
+    - speedscope: https://www.speedscope.app 에 끌어다 놓으면 되는 JSON
+    """
+    profile = ring.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="profile not found")
+
+    if format == "pstats":
+        return Response(
+            profile.pstats_bytes(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile_{profile_id}.pstats"'},
+        )
+    return ORJSONResponse(
+        profile.speedscope(),
+        headers={"Content-Disposition": f'attachment; filename="profile_{profile_id}.speedscope.json"'},
+    )
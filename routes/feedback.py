@@ -1,26 +1,68 @@
-from fastapi import APIRouter, Request, status
-from fastapi.responses import StreamingResponse, JSONResponse
-from models.feedback import FeedbackCreate, FeedbackCreateResult
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
+from models.feedback import Category, ExportFormat, FeedbackCreate, FeedbackCreateResult, FeedbackExportJobCreate
 from zoneinfo import ZoneInfo
-from datetime import datetime
-from io import BytesIO
-from typing import List, Dict, Any
-from utils.excel import make_feedback_excel
+from datetime import datetime, timedelta, timezone
+from tempfile import SpooledTemporaryFile
+from typing import List, Dict, Any, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from utils.excel import FeedbackSheetLayout, FeedbackXlsxWriter, csv_chunk, ndjson_line, normalize_doc
+from db.mongo import MongoManager, get_database, get_mongo, guarded_database
+from db.write_buffer import BatchWriter, get_feedback_writer
+from utils.export_jobs import ExportJob, ExportJobManager, get_export_jobs
+from utils.metrics import span
+from routes.admin import require_admin_token
+import asyncio
+import base64
+import os
 
 router = APIRouter()
 
 COLL_NAME = "feedbacks"
 KST = ZoneInfo("Asia/Seoul")
 
-@router.post("/feedback", response_model=FeedbackCreateResult, status_code=status.HTTP_201_CREATED)
-async def create_feedback(request: Request, body: FeedbackCreate):
-    db = request.app.database
-    coll = db[COLL_NAME]
+EXPORT_BATCH_SIZE = 500
+STREAM_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+FEEDBACK_RETRY_AFTER = 5  # 큐가 가득 찼을 때 Retry-After(초)
+
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
 
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 200
+# 목록은 최신순 (created_at, _id) 내림차순. main.lifespan 의 인덱스와 같은 키 순서
+LIST_SORT = [("created_at", -1), ("_id", -1)]
+EXPORT_SORT = [("created_at", 1), ("_id", 1)]
+# 증분 내보내기의 상한을 현재 시각보다 이만큼 뒤로 둔다. 요청 시점에 created_at 이 정해진 뒤 조금 늦게 보이는
+# 피드백(write-behind 배치, 동시 insert)이 이미 내보낸 워터마크 앞에 끼어들어 영영 빠지지 않도록.
+# 이 워커의 write-behind 큐에 남은 피드백은 BatchWriter.oldest_unwritten 으로 따로 막는다
+EXPORT_SETTLE_SECONDS = float(os.getenv("EXPORT_SETTLE_SECONDS", 5))
+# since(시각만 있는 하한)를 (created_at, _id) 키로 바꿀 때 쓰는 가장 큰 _id
+MAX_OBJECT_ID = ObjectId("f" * 24)
+# 내보내기 커서의 서버 실행 시간 제한. 전체를 훑으므로 요청용 MONGO_MAX_TIME_MS 보다 길게
+EXPORT_MAX_TIME_MS = int(os.getenv("EXPORT_MAX_TIME_MS", 60_000))
+
+ExportKey = Tuple[datetime, ObjectId]
+
+@router.post("/feedback", response_model=FeedbackCreateResult, status_code=status.HTTP_201_CREATED)
+async def create_feedback(
+    body: FeedbackCreate,
+    mongo: MongoManager = Depends(get_mongo),
+    writer: Optional[BatchWriter] = Depends(get_feedback_writer),
+):
+    # write-behind 모드는 브레이커를 거치지 않는다. DB 장애 중에는 BatchWriter 가 기록될 때까지 재시도하며
+    # 큐에 쌓아 두고, 큐가 가득 차면 503 (BatchWriter 참고)
     now = datetime.now(KST)
 
-    # 기본 문서
+    # 기본 문서 (_id 를 미리 발급해 두면 write-behind 모드에서도 같은 id 를 응답)
     doc: Dict[str, Any] = {
+        "_id": ObjectId(),
         "category": body.category,
         "message": body.message,
         "anonymous": body.anonymous,
@@ -37,37 +79,335 @@ async def create_feedback(request: Request, body: FeedbackCreate):
         doc["phone"] = body.phone
         doc["privacy_agree"] = True
 
-    result = await coll.insert_one(doc)
+    if writer is not None:
+        try:
+            writer.submit(doc)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="feedback queue is full",
+                headers={"Retry-After": str(FEEDBACK_RETRY_AFTER)},
+            )
+    else:
+        async with guarded_database(mongo) as db:
+            await db[COLL_NAME].insert_one(doc)
 
     return FeedbackCreateResult(
-        id=str(result.inserted_id),
+        id=str(doc["_id"]),
         created_at=now.isoformat()
     )
 
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """마지막 행의 (created_at, _id) 를 URL 에 그대로 쓸 수 있는 문자열로."""
+    created_at: datetime = doc["created_at"]
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)  # Mongo 는 UTC naive 로 돌려줌
+    raw = f"{int(created_at.timestamp() * 1000)}:{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        millis, oid = raw.split(":", 1)
+        created_at = datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+        return created_at, ObjectId(oid)
+    except (ValueError, InvalidId, OverflowError, OSError):
+        # OverflowError/OSError: datetime 으로 나타낼 수 없는 범위의 millis
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor")
+
+@router.get("/feedback", dependencies=[Depends(require_admin_token)])
+async def list_feedback(
+    limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    category: Optional[List[Category]] = Query(None, description="카테고리 (여러 번 지정 가능)"),
+    db=Depends(get_database),
+    mongo: MongoManager = Depends(get_mongo),
+):
+    """
+    관리자용 피드백 목록 (최신순, X-Admin-Token 필요). (created_at, _id) keyset 페이지네이션이라
+    페이지가 뒤로 가도 skip 없이 인덱스 범위 조회만 한다.
+    응답: {"items": [...], "next_cursor": "..." | null}
+    """
+    query: Dict[str, Any] = {}
+    if category:
+        query["category"] = {"$in": category}
+    if cursor:
+        created_at, oid = decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": oid}},
+        ]
+
+    # 한 건 더 읽어 다음 페이지 존재 여부를 판단
+    docs = await (
+        db[COLL_NAME].find(query, max_time_ms=mongo.max_time_ms)
+        .sort(LIST_SORT).limit(limit + 1).to_list(length=limit + 1)
+    )
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return {
+        "items": [normalize_doc(doc) for doc in docs[:limit]],
+        "next_cursor": next_cursor,
+    }
+
+def _export_query(lower: Optional[ExportKey], upper: Optional[ExportKey],
+                  cutoff: Optional[datetime] = None) -> Dict[str, Any]:
+    """(created_at, _id) 기준 lower < 키 <= upper, created_at < cutoff 인 피드백."""
+    clauses: List[Dict[str, Any]] = []
+    if lower is not None:
+        created_at, oid = lower
+        clauses.append({"$or": [{"created_at": {"$gt": created_at}}, {"created_at": created_at, "_id": {"$gt": oid}}]})
+    if upper is not None:
+        created_at, oid = upper
+        clauses.append({"$or": [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "_id": {"$lte": oid}}]})
+    if cutoff is not None:
+        clauses.append({"created_at": {"$lt": cutoff}})
+    if len(clauses) > 1:
+        return {"$and": clauses}
+    return clauses[0] if clauses else {}
+
+def _export_lower(since: Optional[datetime], after: Optional[str]) -> Optional[ExportKey]:
+    """after(이전 응답의 X-Feedback-After)가 있으면 그 키, 아니면 since 시각 이후 전부."""
+    if after:
+        return decode_cursor(after)
+    return (since, MAX_OBJECT_ID) if since is not None else None
+
+def _export_cutoff(writer: Optional[BatchWriter]) -> datetime:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=EXPORT_SETTLE_SECONDS)
+    oldest = writer.oldest_unwritten() if writer is not None else None
+    return min(cutoff, oldest) if oldest is not None else cutoff
+
+async def _latest_key(coll, lower: Optional[ExportKey], cutoff: datetime, max_time_ms: int) -> Optional[ExportKey]:
+    """이번 내보내기의 상한(포함): cutoff 이전 마지막 피드백의 (created_at, _id). 없으면 None."""
+    last = await coll.find_one(
+        _export_query(lower, None, cutoff), {"created_at": 1}, sort=LIST_SORT, max_time_ms=max_time_ms,
+    )
+    return (last["created_at"], last["_id"]) if last is not None else None
+
+async def _build_layout(coll, lower: Optional[ExportKey], upper: ExportKey) -> FeedbackSheetLayout:
+    """1차 패스: 커서를 배치 단위로 훑으며 헤더/열 너비를 계산."""
+    layout = FeedbackSheetLayout()
+    async for doc in _export_cursor(coll, lower, upper):
+        layout.observe(normalize_doc(doc))
+    return layout
+
+def _export_cursor(coll, lower: Optional[ExportKey], upper: ExportKey):
+    """상한을 (created_at, _id) 로 고정하므로 두 패스가 같은 행을 본다."""
+    return (
+        coll.find(_export_query(lower, upper), max_time_ms=EXPORT_MAX_TIME_MS)
+        .sort(EXPORT_SORT).batch_size(EXPORT_BATCH_SIZE)
+    )
+
+def _watermark_headers(upper: ExportKey) -> Dict[str, str]:
+    """
+    X-Feedback-After: 다음 증분 내보내기의 after 로 그대로 쓰는 (created_at, _id) 키 (같은 밀리초 피드백도 빠짐없이).
+    X-Feedback-Until: 마지막 created_at (사람이 읽는 용도, since 로 쓰면 같은 밀리초의 나머지는 빠질 수 있음).
+    """
+    created_at, oid = upper
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return {
+        "X-Feedback-After": encode_cursor({"created_at": created_at, "_id": oid}),
+        "X-Feedback-Until": created_at.astimezone(KST).isoformat(timespec="milliseconds"),
+    }
+
+async def _file_chunks(fileobj):
+    try:
+        while chunk := fileobj.read(STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        fileobj.close()
+
+async def _csv_chunks(coll, headers: List[str], lower: Optional[ExportKey], upper: ExportKey):
+    yield "\ufeff" + csv_chunk([headers])  # Excel 에서 한글이 깨지지 않도록 BOM
+    rows: List[List[Any]] = []
+    async for doc in _export_cursor(coll, lower, upper):
+        row = normalize_doc(doc)
+        rows.append([row.get(h, "") for h in headers])
+        if len(rows) >= EXPORT_BATCH_SIZE:
+            yield csv_chunk(rows)
+            rows = []
+    if rows:
+        yield csv_chunk(rows)
+
+async def _ndjson_chunks(coll, lower: Optional[ExportKey], upper: ExportKey):
+    lines: List[str] = []
+    async for doc in _export_cursor(coll, lower, upper):
+        lines.append(ndjson_line(normalize_doc(doc)))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+async def _write_xlsx(coll, layout: FeedbackSheetLayout, lower: Optional[ExportKey], upper: ExportKey, fileobj):
+    """
+    2차 패스. 셀 기록과 저장(zip 압축)은 CPU 를 오래 쓰므로 배치 단위로 스레드에서 돌려
+    내보내기 중에도 이벤트 루프가 /api/rooms 등 다른 요청을 처리할 수 있게 한다.
+    """
+    writer = FeedbackXlsxWriter(layout)
+    with span("feedback_export.rows"):
+        rows: List[Dict[str, Any]] = []
+        async for doc in _export_cursor(coll, lower, upper):
+            rows.append(normalize_doc(doc))
+            if len(rows) >= EXPORT_BATCH_SIZE:
+                await asyncio.to_thread(writer.extend, rows)
+                rows = []
+        if rows:
+            await asyncio.to_thread(writer.extend, rows)
+    with span("feedback_export.save"):
+        await asyncio.to_thread(writer.save, fileobj)
+
+async def _write_chunks(chunks, path: str):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        async for chunk in chunks:
+            await asyncio.to_thread(f.write, chunk)
+
+async def _build_export_file(
+    coll, format: ExportFormat, lower: Optional[ExportKey], upper: ExportKey, path: str,
+) -> int:
+    """내보내기 작업 본체. path 에 파일을 완성하고 기록한 행 수를 돌려준다."""
+    if format == "ndjson":
+        rows = 0
+
+        async def counted():
+            nonlocal rows
+            async for chunk in _ndjson_chunks(coll, lower, upper):
+                rows += chunk.count("\n")
+                yield chunk
+
+        await _write_chunks(counted(), path)
+        return rows
+
+    with span("feedback_export.layout"):
+        layout = await _build_layout(coll, lower, upper)
+    if format == "csv":
+        await _write_chunks(_csv_chunks(coll, layout.headers, lower, upper), path)
+    else:
+        with open(path, "wb") as f:
+            await _write_xlsx(coll, layout, lower, upper, f)
+    return layout.row_count
+
 @router.get("/feedback/export")
-async def export_feedback(request: Request):
+async def export_feedback(
+    format: ExportFormat = Query("xlsx", description="xlsx | csv | ndjson"),
+    since: Optional[datetime] = Query(None, description="이 시각(ISO 8601) 이후 피드백만"),
+    after: Optional[str] = Query(None, description="이전 응답의 X-Feedback-After 이후 피드백만 (증분 내보내기)"),
+    db=Depends(get_database),
+    mongo: MongoManager = Depends(get_mongo),
+    writer: Optional[BatchWriter] = Depends(get_feedback_writer),
+):
     """
-    모든 피드백을 Excel 파일로 다운로드.
-    성공: application/vnd.openxmlformats-officedocument.spreadsheetml.sheet
+    피드백을 파일로 다운로드. 커서를 배치 단위로 읽어 메모리 사용량이 행 수와 무관.
+    - xlsx: application/vnd.openxmlformats-officedocument.spreadsheetml.sheet (write-only 모드)
+    - csv: text/csv, ndjson: application/x-ndjson (청크 단위로 바로 전송)
+    - 증분: 응답 헤더 X-Feedback-After 를 다음 요청의 after 로 쓰면 빠짐없이 이어진다 ((created_at, _id) 키).
+      상한은 EXPORT_SETTLE_SECONDS 전까지라 방금 들어온 피드백은 다음 내보내기에 포함된다.
     실패(데이터 없음): 404 + {"message": "No feedback data"}
     """
-    db = request.app.database
     coll = db[COLL_NAME]
+    timestamp = datetime.now(KST).strftime("%Y%m%d_%H%M%S")
 
-    docs: List[Dict[str, Any]] = await coll.find({}).sort("created_at", 1).to_list(None)
+    lower = _export_lower(since, after)
+    upper = await _latest_key(coll, lower, _export_cutoff(writer), mongo.max_time_ms)
+    if upper is None:
+        return JSONResponse({"message": "No feedback data"}, status_code=404)
+
+    if format == "ndjson":
+        return StreamingResponse(
+            _ndjson_chunks(coll, lower, upper),
+            media_type=EXPORT_MEDIA_TYPES["ndjson"],
+            headers={
+                "Content-Disposition": f'attachment; filename=\"feedback_export_{timestamp}.ndjson\"',
+                **_watermark_headers(upper),
+            }
+        )
 
-    if not docs:
+    with span("feedback_export.layout"):
+        layout = await _build_layout(coll, lower, upper)
+    if layout.row_count == 0:
         return JSONResponse({"message": "No feedback data"}, status_code=404)
 
-    wb = make_feedback_excel(docs)
+    if format == "csv":
+        return StreamingResponse(
+            _csv_chunks(coll, layout.headers, lower, upper),
+            media_type=EXPORT_MEDIA_TYPES["csv"],
+            headers={
+                "Content-Disposition": f'attachment; filename=\"feedback_export_{timestamp}.csv\"',
+                **_watermark_headers(upper),
+            }
+        )
 
-    buf = BytesIO()
-    wb.save(buf)
+    # 일정 크기를 넘으면 디스크로 넘어가는 임시 파일에 저장 후 청크 단위 전송
+    buf = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    await _write_xlsx(coll, layout, lower, upper, buf)
     buf.seek(0)
 
-    filename = f'feedback_export_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
+    filename = f"feedback_export_{timestamp}.xlsx"
     return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f'attachment; filename=\"{filename}\"'}
-    )
\ No newline at end of file
+        _file_chunks(buf),
+        media_type=EXPORT_MEDIA_TYPES["xlsx"],
+        headers={"Content-Disposition": f'attachment; filename=\"{filename}\"', **_watermark_headers(upper)}
+    )
+
+def _job_response(job: ExportJob) -> Dict[str, Any]:
+    body = job.summary()
+    body["status_url"] = f"/api/feedback/export/jobs/{job.id}"
+    body["download_url"] = f"/api/feedback/export/jobs/{job.id}/download" if job.status == "done" else None
+    return body
+
+@router.post("/feedback/export/jobs", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(require_admin_token)])
+async def create_export_job(
+    body: FeedbackExportJobCreate,
+    db=Depends(get_database),
+    mongo: MongoManager = Depends(get_mongo),
+    jobs: ExportJobManager = Depends(get_export_jobs),
+    writer: Optional[BatchWriter] = Depends(get_feedback_writer),
+):
+    """
+    피드백 내보내기를 백그라운드 작업으로 시작. 응답의 status_url 을 폴링하다가 done 이 되면 download_url 로 받는다.
+    파일은 (형식, 하한, 상한 (created_at, _id)) 으로 캐시되어, 그 사이 새 피드백이 없으면 다시 만들지 않고
+    바로 done(cached=true, 200) 으로 응답한다. 같은 조건의 작업이 진행 중이면 그 작업을 돌려준다.
+    실패(데이터 없음): 404 + {"message": "No feedback data"}
+    """
+    coll = db[COLL_NAME]
+    lower = _export_lower(body.since, body.after)
+    upper = await _latest_key(coll, lower, _export_cutoff(writer), mongo.max_time_ms)
+    if upper is None:
+        return JSONResponse({"message": "No feedback data"}, status_code=404)
+
+    timestamp = datetime.now(KST).strftime("%Y%m%d_%H%M%S")
+    job = jobs.submit(
+        (body.format, lower, upper),
+        body.format,
+        f"feedback_export_{timestamp}.{body.format}",
+        lambda path: _build_export_file(coll, body.format, lower, upper, path),
+        meta=_watermark_headers(upper),
+    )
+    code = status.HTTP_200_OK if job.status == "done" else status.HTTP_202_ACCEPTED
+    return JSONResponse(_job_response(job), status_code=code)
+
+def _get_job(job_id: str, jobs: ExportJobManager) -> ExportJob:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="export job not found")
+    return job
+
+@router.get("/feedback/export/jobs/{job_id}", dependencies=[Depends(require_admin_token)])
+async def get_export_job(job_id: str, jobs: ExportJobManager = Depends(get_export_jobs)):
+    """작업 상태: pending | running | done | failed."""
+    return _job_response(_get_job(job_id, jobs))
+
+@router.get("/feedback/export/jobs/{job_id}/download", dependencies=[Depends(require_admin_token)])
+async def download_export_job(job_id: str, jobs: ExportJobManager = Depends(get_export_jobs)):
+    """완료된 작업의 파일. 아직 끝나지 않았으면 409, 캐시에서 밀려난 파일이면 410."""
+    job = _get_job(job_id, jobs)
+    if job.status != "done":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"export job is {job.status}")
+    if not os.path.exists(job.path):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="export file expired")
+    return FileResponse(
+        job.path,
+        media_type=EXPORT_MEDIA_TYPES[job.format],
+        filename=job.filename,
+        headers=job.meta,
+    )
@@ -1,21 +1,41 @@
-from fastapi import APIRouter, Request
-from pymongo.errors import PyMongoError
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse, PlainTextResponse
+from db.mongo import get_mongo, MongoManager
+from db.health_monitor import HealthMonitor, get_health_monitor
+from utils.occupancy import OccupancyIndex, get_occupancy_index
+from utils.single_flight import SingleFlight, get_single_flight
+from utils.metrics import render_metrics
 
 health_router = APIRouter()
 
 @health_router.get("/health")
 @health_router.head("/health")  # HEAD 요청도 허용
-async def health_check(request: Request):
-    db_status = "unknown"
-
-    try:
-        result = await request.app.database.command("ping")
-        db_status = "ok" if result.get("ok") == 1 else "fail"
-    except (AttributeError, PyMongoError):
-        db_status = "fail"
-
+async def health_check(
+    monitor: HealthMonitor = Depends(get_health_monitor),
+    mongo: MongoManager = Depends(get_mongo),
+    index: OccupancyIndex = Depends(get_occupancy_index),
+    flight: SingleFlight = Depends(get_single_flight),
+):
+    # Mongo 상태는 백그라운드 HealthMonitor 의 최근 probe 결과 (요청마다 ping 하지 않음)
     return {
         "status": "ok",
-        "mongodb": db_status,
+        "mongodb": monitor.mongodb_status,
+        "mongodb_probe": monitor.snapshot(),
+        "mongodb_pool": mongo.stats(),
+        "timetable_source": index.source,  # "mongo" 또는 바이너리 스냅샷 경로
+        "single_flight": flight.stats(),     # coalesced = 다른 요청의 DB 조회를 공유한 횟수
         "version": "1.0.0"
-    }
\ No newline at end of file
+    }
+
+@health_router.get("/ready")
+@health_router.head("/ready")
+async def readiness_check(monitor: HealthMonitor = Depends(get_health_monitor)):
+    """probe 실패/지연 임계 초과 시 503 + degraded."""
+    result = monitor.readiness()
+    status_code = 200 if result["status"] == "ready" else 503
+    return JSONResponse(result, status_code=status_code)
+
+@health_router.get("/metrics")
+async def metrics():
+    """Prometheus 텍스트 형식: 라우트별 지연, 핸들러 stage 시간, Mongo 명령/반환 도큐먼트 수."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
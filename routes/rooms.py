@@ -1,12 +1,29 @@
-from fastapi import APIRouter
-from typing import Optional, List, Dict, Any
-from db.mongo import get_database
-from utils.time_utils import calculate_minutes_diff, format_minutes_to_string
-from pymongo import ASCENDING
-from collections import defaultdict
-import re
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pymongo.errors import PyMongoError
+from typing import Optional, List, Dict, Any, Literal
+from db.mongo import get_mongo, MongoManager, LECTURES_COLL, ROOMS_COLL
+from utils.time_utils import format_minutes_to_string
+from utils.room_utils import extract_floor, room_sort_key
+from utils.occupancy import OccupancyIndex, get_occupancy_index
+from utils.responses import ORJSONResponse
+from utils.live_status import RoomStatusBroadcaster, get_broadcaster, now_kst
+from utils.single_flight import SingleFlight, get_single_flight
+from utils.metrics import span
+from utils.response_cache import (
+    VARY_HEADERS, CachedResponse, RoomStatusCache, cache_control, etag_matches, get_room_cache, make_etag,
+    seconds_until,
+)
+from models.rooms import BUILDING_PATTERN, RoomBatchRequest
+import asyncio
+import orjson
+import os
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# /api/rooms 계산 경로: "index"(메모리 인덱스, 기본) | "pipeline"(Mongo 집계)
+RoomsMode = Literal["index", "pipeline"]
+ROOMS_STATUS_MODE = os.getenv("ROOMS_STATUS_MODE", "index")
 
 # 한글 요일 → 영문 매핑
 weekday_map = {
@@ -23,6 +40,8 @@ weekday_map = {
 SOON_THRESHOLD = 60  # 분 단위
 DEFAULT_AVAILABLE_MINUTES = 9999
 
+SSE_KEEPALIVE_SECONDS = 25
+
 
 def lecture_to_dict(lec: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """Mongo에서 가져온 강의 도큐먼트를 응답용 dict로 축약."""
@@ -36,34 +55,7 @@ def lecture_to_dict(lec: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     }
 
 
-def extract_floor(room: str) -> str:
-    """
-    강의실 문자열에서 층 정보를 추출.
-    예) '414' -> '4', 'B106' -> 'B1', '1201' -> '12'
-    규칙:
-      - 앞 1~2자리가 층(지하: 'B' + 숫자)
-      - 숫자만 시작하면 마지막 두 자리는 호수로 보고 그 앞을 층으로 간주
-    """
-    # 지하(B) 포함 가능, 숫자 연속 캡처
-    match = re.match(r"(B?\d+)", room)
-    if not match:
-        return "?"
-    prefix = match.group(1)  # 예: 'B106' 또는 '414' 또는 '1201'
-
-    if prefix.startswith("B"):
-        # 'B106' -> 'B1' 로 처리
-        # 'B' 다음의 첫 자리 숫자를 층으로 판단
-        digits = prefix[1:]
-        return f"B{digits[0]}" if digits else "B?"
-    else:
-        # '414' -> '4', '1201' -> '12'
-        if len(prefix) <= 2:
-            # '10' 같은 경우 전체가 층일 가능성: '10'층
-            return prefix
-        return prefix[:-2]
-
-
-def determine_room_status(target_time: str,
+def determine_room_status(target_min: int,
                           next_lecture: Optional[Dict[str, Any]],
                           current_lecture: Optional[Dict[str, Any]]):
     """
@@ -72,7 +64,7 @@ def determine_room_status(target_time: str,
     if current_lecture:
         return "in_use", 0, None
     elif next_lecture:
-        minutes = calculate_minutes_diff(target_time, next_lecture["start_time"])
+        minutes = next_lecture["start_min"] - target_min
         status = "soon" if minutes <= SOON_THRESHOLD else "empty"
         msg = f"{format_minutes_to_string(minutes)} 후 다음 수업이 시작됩니다"
         return status, minutes, msg
@@ -80,100 +72,315 @@ def determine_room_status(target_time: str,
         return "empty", DEFAULT_AVAILABLE_MINUTES, None
 
 
+def build_room_statuses(index: OccupancyIndex,
+                        building: str,
+                        day_eng: str,
+                        target_min: int,
+                        floor: Optional[str] = None) -> List[Dict[str, Any]]:
+    """건물(＋층)의 전체 방에 대해 target_min(자정 기준 분) 기준 상태 목록을 만든다."""
+    bld = int(building)
+
+    # 건물(＋층)의 전체 방 목록은 인덱스에 층 → 방이름 순으로 정렬되어 있음
+    # 현재 / 다음 수업 판별은 시작 시각 정렬 배열에서 bisect
+    return [
+        room_status(building, room, target_min,
+                    *index.schedule(bld, day_eng, room).lookup(target_min))
+        for room in index.rooms(bld, floor)
+    ]
+
+
+def room_status(building: str,
+                room: str,
+                target_min: int,
+                current: Optional[Dict[str, Any]],
+                next_lectures: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """한 강의실의 응답 항목."""
+    next_lecture = next_lectures[0] if next_lectures else None
+    status, available_minutes, soon_message = determine_room_status(
+        target_min, next_lecture, current
+    )
+    return {
+        "building": building,
+        "floor": extract_floor(room),
+        "room_number": room,
+        "status": status,  # "empty" | "soon" | "in_use"
+        "current_lecture": lecture_to_dict(current),
+        "next_lecture": lecture_to_dict(next_lecture),
+        "next_lectures": [lecture_to_dict(lec) for lec in next_lectures],
+        "available_minutes": available_minutes,
+        "soon_message": soon_message,
+    }
+
+
+def compact_room_statuses(building: str, rooms: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    compact=true 응답 형태.
+    - 강의는 lectures 배열에 한 번만 담고, 각 방은 그 위치(current, next)로 참조
+    - next_lecture 는 next 의 첫 항목과 같으므로 생략, null 필드는 제거
+    """
+    lectures: List[Dict[str, Any]] = []
+    positions: Dict[tuple, int] = {}
+
+    def ref(lec: Dict[str, Any]) -> int:
+        key = (lec["course_name"], lec["start_time"], lec["end_time"], lec["professor"])
+        pos = positions.get(key)
+        if pos is None:
+            pos = positions[key] = len(lectures)
+            lectures.append({k: v for k, v in lec.items() if v is not None})
+        return pos
+
+    items: List[Dict[str, Any]] = []
+    for r in rooms:
+        item: Dict[str, Any] = {
+            "floor": r["floor"],
+            "room_number": r["room_number"],
+            "status": r["status"],
+            "available_minutes": r["available_minutes"],
+        }
+        if r["soon_message"] is not None:
+            item["soon_message"] = r["soon_message"]
+        if r["current_lecture"] is not None:
+            item["current"] = ref(r["current_lecture"])
+        if r["next_lectures"]:
+            item["next"] = [ref(lec) for lec in r["next_lectures"]]
+        items.append(item)
+
+    return {"building": building, "lectures": lectures, "rooms": items}
+
+
+async def fetch_room_statuses_pipeline(mongo: MongoManager,
+                                       building: str,
+                                       day_eng: str,
+                                       target_min: int,
+                                       floor: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    build_room_statuses 와 같은 결과를 Mongo 집계로 계산 (비교/측정용).
+    - 이미 끝난 수업은 서버에서 제외하고, 방별로 현재/이후 수업 배열만 lecture_to_dict 필드로 전송
+    - 방 목록은 강의실 카탈로그의 (building, floor, sort_key) 인덱스로 정렬된 채 조회
+    - start_min/end_min 이 채워진 컬렉션 전제 (mongo.minutes_migrated 가 False 면 호출하지 않음)
+    """
+    db = mongo.database
+    bld = int(building)
+
+    rooms_filter: Dict[str, Any] = {"building": bld}
+    if floor:
+        rooms_filter["floor"] = floor
+    rooms_cursor = db[ROOMS_COLL].find(
+        rooms_filter, {"_id": 0, "room": 1}, max_time_ms=mongo.max_time_ms
+    ).sort("sort_key", 1)
+
+    match: Dict[str, Any] = {"building": bld, "day": day_eng, "end_min": {"$gt": target_min}}
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"start_min": 1}},
+        {"$group": {
+            "_id": "$room",
+            "lectures": {"$push": {
+                "course_name": "$course_name",
+                "start_time": "$start_time",
+                "end_time": "$end_time",
+                "professor": "$professor",
+                "start_min": "$start_min",
+            }},
+        }},
+        {"$project": {
+            "current": {"$filter": {"input": "$lectures",
+                                    "cond": {"$lte": ["$$this.start_min", target_min]}}},
+            "next": {"$filter": {"input": "$lectures",
+                                 "cond": {"$gt": ["$$this.start_min", target_min]}}},
+        }},
+    ]
+
+    catalog_docs, grouped = await asyncio.gather(
+        rooms_cursor.to_list(length=None),
+        db[LECTURES_COLL].aggregate(pipeline, maxTimeMS=mongo.max_time_ms).to_list(length=None),
+    )
+    by_room = {g["_id"]: g for g in grouped}
+
+    rooms = [d["room"] for d in catalog_docs]
+    if not rooms:
+        # 카탈로그가 아직 없으면 distinct 로 대체
+        rooms = sorted(await db[LECTURES_COLL].distinct("room", {"building": bld}), key=room_sort_key)
+        if floor:
+            rooms = [r for r in rooms if extract_floor(r) == floor]
+
+    response: List[Dict[str, Any]] = []
+    for room in rooms:
+        g = by_room.get(room, {})
+        current_list = g.get("current", [])
+        # 인덱스 경로와 같이 진행 중인 수업이 여럿이면 가장 늦게 시작한 수업
+        current = current_list[-1] if current_list else None
+        response.append(room_status(building, room, target_min, current, g.get("next", [])))
+    return response
+
+
 @router.get("/rooms")
 async def get_rooms(
-    building: str,
+    request: Request,
     hour: int,
     minute: int,
     weekday: str,
+    building: str = Query(..., pattern=BUILDING_PATTERN, description="건물 번호 (숫자)"),
     floor: Optional[str] = None,
+    compact: bool = Query(False, description="강의 중복 제거 + null 필드 생략 형태로 응답"),
+    mode: Optional[RoomsMode] = Query(None, description="계산 경로 (기본: ROOMS_STATUS_MODE)"),
+    index: OccupancyIndex = Depends(get_occupancy_index),
+    cache: RoomStatusCache = Depends(get_room_cache),
+    mongo: MongoManager = Depends(get_mongo),
+    flight: SingleFlight = Depends(get_single_flight),
 ):
     """
     건물/요일/시각(+선택: 층) 기준으로 강의실 상태를 조회.
-    - 핵심 수정: 해당 요일에 수업이 '없어도' 건물(＋층)의 전체 방 목록을 기준으로 응답에 포함.
-      → MongoDB distinct('room')로 모든 방 이름을 뽑은 뒤,
-        그 중 요일에 해당하는 수업을 매핑하여 상태 계산.
+    - 해당 요일에 수업이 '없어도' 건물(＋층)의 전체 방 목록을 기준으로 응답에 포함.
+    - 시간표는 main.lifespan 에서 적재한 OccupancyIndex 에서 읽으므로 요청마다 DB 조회가 없음.
+    - 응답은 건물의 다음 수업 시작/종료 시각까지 서버에 캐시되며, ETag 가 같으면 304 를 반환.
+      클라이언트 max-age 는 조회 시각이 지금(KST)일 때만 주고, 시각을 지정한 조회는 no-cache.
+    - mode=pipeline 이면 캐시 없이 Mongo 집계로 계산 (경로별 지연/전송량 비교용).
+      DB 장애(브레이커 open, 시간 초과 등) 시에는 인덱스 경로로 대신 응답.
+      같은 조건의 동시 요청은 집계 하나를 공유 (SingleFlight).
+    - compact=true 이면 compact_room_statuses 형태로 응답.
     """
-    db = get_database()
     target_time = f"{hour:02d}:{minute:02d}"
+    target_min = hour * 60 + minute
 
     # 요일 검증 및 변환
     day_eng = weekday_map.get(weekday)
     if not day_eng:
         return {"error": "잘못된 요일 형식입니다. (월~일 중 하나를 입력해주세요)"}
 
-    # 1) 해당 요일의 수업 목록 조회
-    lectures_query: Dict[str, Any] = {"building": int(building), "day": day_eng}
-    if floor:
-        # floor가 'B1', '4', '12' 형태라고 가정
-        # 정규식 특수문자 이스케이프
-        lectures_query["room"] = {"$regex": f"^{re.escape(floor)}"}
+    # 집계는 start_min/end_min 에 의존하므로 마이그레이션 전이면 인덱스 경로로 응답
+    if (mode or ROOMS_STATUS_MODE) == "pipeline" and mongo.minutes_migrated and mongo.breaker.allow():
+        try:
+            with span("rooms.pipeline"):
+                rooms = await flight.do(
+                    ("rooms", building, floor, day_eng, target_min),
+                    lambda: fetch_room_statuses_pipeline(mongo, building, day_eng, target_min, floor),
+                )
+        except PyMongoError as e:
+            # Mongo 가 느리거나 끊겼으면 메모리 인덱스(또는 바이너리 스냅샷) 경로로 응답
+            mongo.breaker.record_failure()
+            print("강의실 상태 집계 실패, 인덱스로 응답:", e)
+        else:
+            mongo.breaker.record_success()
+            return ORJSONResponse(compact_room_statuses(building, rooms) if compact else rooms)
 
-    cursor = db["2025_2_lectures"].find(lectures_query).sort("start_time", ASCENDING)
-    lectures = await cursor.to_list(length=None)
+    key = (index.version, building, floor, weekday, target_time, compact)
+    entry = cache.get(key)
+    if entry is None:
+        with span("rooms.build"):
+            boundary = index.next_boundary(int(building), day_eng, target_min)
+            rooms = build_room_statuses(index, building, day_eng, target_min, floor)
+        with span("rooms.serialize"):
+            body = ORJSONResponse(compact_room_statuses(building, rooms) if compact else rooms).body
+        entry = CachedResponse(body, make_etag(key, boundary), seconds_until(target_min, boundary), boundary)
+        cache.put(key, entry)
 
-    # 방 -> 그 요일의 강의 리스트 매핑
-    rooms_dict: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    for lec in lectures:
-        rooms_dict[lec["room"]].append(lec)
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": cache_control(day_eng, target_min, entry.boundary, now_kst()),
+        **VARY_HEADERS,
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
 
-    # 2) 건물(＋층)에 존재하는 모든 방 목록(요일 무관)
-    rooms_filter: Dict[str, Any] = {"building": int(building)}
-    if floor:
-        rooms_filter["room"] = {"$regex": f"^{re.escape(floor)}"}
-
-    all_rooms_set = set(await db["2025_2_lectures"].distinct("room", rooms_filter))
-    # 안전망: 혹시 요일 쿼리로만 잡힌 방이 있으면 합집합
-    all_rooms_set |= set(rooms_dict.keys())
-
-    # 3) 정렬 키: 층 → 방이름
-    def _sort_key(r: str):
-        fl = extract_floor(r)  # 예: 'B1', '4', '12', '?'
-        # 층을 정수/우선순위로 변환
-        if fl.startswith("B"):
-            # 지하층을 맨 앞쪽으로 (B1, B2, ...)
-            try:
-                bnum = int(fl[1:])  # 'B1' -> 1
-            except ValueError:
-                bnum = 99
-            floor_key = -100 + (-bnum)  # B1 < B2 < ... < B99
-        else:
-            try:
-                floor_key = int(fl)  # '12' -> 12
-            except ValueError:
-                floor_key = 999  # 알 수 없는 층은 맨 뒤
-        return (floor_key, r)
 
-    response: List[Dict[str, Any]] = []
+@router.post("/rooms/batch")
+async def get_rooms_batch(
+    body: RoomBatchRequest,
+    index: OccupancyIndex = Depends(get_occupancy_index),
+):
+    """
+    여러 (건물, 층, 요일, 시각) 조회를 한 번에 처리.
+    - 각 조회 결과는 /api/rooms 응답과 동일하며, RoomQuery.key('건물|층|요일|HH:MM')로 묶어 반환.
+    - 같은 키의 조회는 한 번만 계산.
+    """
+    results: Dict[str, Any] = {}
+    for q in body.queries:
+        key = q.key
+        if key in results:
+            continue
 
-    for room in sorted(all_rooms_set, key=_sort_key):
-        room_lectures = rooms_dict.get(room, [])
+        day_eng = weekday_map.get(q.weekday)
+        if not day_eng:
+            results[key] = {"error": "잘못된 요일 형식입니다. (월~일 중 하나를 입력해주세요)"}
+            continue
 
-        # 현재 / 다음 수업 판별
-        current: Optional[Dict[str, Any]] = None
-        next_lectures: List[Dict[str, Any]] = []
+        target_min = q.hour * 60 + q.minute
+        results[key] = build_room_statuses(index, q.building, day_eng, target_min, q.floor)
 
-        for lec in room_lectures:
-            if lec["start_time"] <= target_time < lec["end_time"]:
-                current = lec
-            elif lec["start_time"] > target_time:
-                next_lectures.append(lec)
+    return ORJSONResponse({"results": results})
 
-        next_lecture = next_lectures[0] if next_lectures else None
-        status, available_minutes, soon_message = determine_room_status(
-            target_time, next_lecture, current
-        )
 
-        response.append({
-            "building": building,
+@router.get("/rooms/free")
+async def get_free_rooms(
+    weekday: str,
+    hour: int = Query(..., ge=0, le=23),
+    minute: int = Query(..., ge=0, le=59),
+    duration: int = Query(..., ge=1, le=24 * 60, description="최소 연속 공강 시간(분)"),
+    building: Optional[str] = Query(None, pattern=BUILDING_PATTERN, description="건물 번호 (숫자)"),
+    floor: Optional[str] = None,
+    index: OccupancyIndex = Depends(get_occupancy_index),
+):
+    """
+    요일/시각 기준으로 duration 분 이상 연속으로 비어 있는 강의실을 캠퍼스 전체(또는 건물/층)에서 검색.
+    - 강의실 × 분 단위 점유 행렬을 한 번에 검사하므로 건물 수와 무관하게 요청 1회로 처리.
+    - available_minutes: 다음 수업까지 남은 분 (그날 남은 수업이 없으면 9999)
+    """
+    day_eng = weekday_map.get(weekday)
+    if not day_eng:
+        return {"error": "잘못된 요일 형식입니다. (월~일 중 하나를 입력해주세요)"}
+
+    bld = int(building) if building else None
+    free = index.free_rooms(day_eng, hour * 60 + minute, duration, bld, floor)
+
+    return ORJSONResponse([
+        {
+            "building": str(b),
             "floor": extract_floor(room),
             "room_number": room,
-            "status": status,  # "empty" | "soon" | "in_use"
-            "current_lecture": lecture_to_dict(current),
-            "next_lecture": lecture_to_dict(next_lecture),
-            "next_lectures": [lecture_to_dict(lec) for lec in next_lectures],
-            "available_minutes": available_minutes,
-            "soon_message": soon_message,
-        })
+            "available_minutes": DEFAULT_AVAILABLE_MINUTES if minutes is None else minutes,
+        }
+        for b, room, minutes in free
+    ])
 
-    return response
+
+def _sse(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.get("/rooms/stream")
+async def stream_rooms(
+    request: Request,
+    building: str = Query(..., pattern=BUILDING_PATTERN, description="건물 번호 (숫자)"),
+    floor: Optional[str] = None,
+    broadcaster: RoomStatusBroadcaster = Depends(get_broadcaster),
+):
+    """
+    건물(＋층) 강의실 상태 Server-Sent Events 스트림 (현재 시각, KST 기준).
+    - event: snapshot → /api/rooms 와 같은 전체 목록 (연결 직후, 또는 지연된 구독자 재동기화)
+    - event: update → 수업 시작/종료 등으로 상태가 바뀐 방만
+    폴링 대신 연결을 유지하고, 변경이 없으면 주기적으로 keepalive 주석만 보낸다.
+    """
+    queue, snapshot = broadcaster.subscribe(building, floor)
+
+    async def events():
+        try:
+            yield _sse("snapshot", snapshot)
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keepalive\n\n"
+                    continue
+                yield _sse(event, data)
+        finally:
+            broadcaster.unsubscribe(building, floor, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Query
-from typing import List, Union, Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response
+from typing import Any, Dict, List, Union, Optional
 from pydantic import BaseModel, Field
-from db.mongo import get_database
+from pymongo.errors import PyMongoError
+from db.mongo import get_mongo, LECTURES_COLL, MongoManager
+from utils.occupancy import DAYS, OccupancyIndex, RoomSchedule, get_occupancy_index
+from utils.responses import ORJSONResponse
+from utils.response_cache import VARY_HEADERS, etag_matches, make_etag
+from utils.single_flight import SingleFlight, get_single_flight
+from utils.metrics import span
+from utils.time_utils import time_to_minutes
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 KOR2ENG = {
     "월": "monday", "화": "tuesday", "수": "wednesday",
@@ -11,6 +19,9 @@ KOR2ENG = {
 }
 ENG2KOR = {v: k for k, v in KOR2ENG.items()}
 
+# 주간 시간표는 학기 단위로만 바뀌므로 길게 캐시하고 ETag 로 재검증
+WEEKLY_MAX_AGE = 3600
+
 class TimetableItem(BaseModel):
     day: str = Field(..., description="요일(한글)")
     start_time: str
@@ -33,8 +44,14 @@ async def get_timetable(
     room_number: str = Query(..., description="강의실 번호"),
     weekday: str = Query(..., description='요일("월","화","수","목","금","토","일")'),
     limit: Optional[int] = Query(None, ge=1, le=200, description="(옵션) 최대 반환 개수"),
+    mongo: MongoManager = Depends(get_mongo),
+    index: OccupancyIndex = Depends(get_occupancy_index),
+    flight: SingleFlight = Depends(get_single_flight),
 ):
-
+    """
+    Mongo 에서 조회하되 (같은 조건의 동시 요청은 조회 하나를 공유), DB 장애(브레이커 open, 시간 초과 등) 시에는
+    메모리 인덱스(Mongo 또는 바이너리 스냅샷에서 적재)로 같은 형태의 응답을 만든다.
+    """
     wd = weekday.strip()
     # 요일 입력이 잘못되면 빈 배열 반환
     if wd not in KOR2ENG:
@@ -44,23 +61,127 @@ async def get_timetable(
     bld = _normalize_building(building)
     room = room_number.strip()
 
-    db = get_database()
-    coll = db["2025_2_lectures"]
+    if mongo.breaker.allow():
+        try:
+            with span("timetable.find"):
+                docs = await flight.do(
+                    ("timetable", bld, room, day_eng, limit),
+                    lambda: _fetch_timetable(mongo, bld, room, day_eng, limit),
+                )
+        except PyMongoError as e:
+            mongo.breaker.record_failure()
+            print("시간표 조회 실패, 인덱스로 응답:", e)
+        else:
+            mongo.breaker.record_success()
+            return _timetable_response(docs, wd)
+
+    docs = index.schedule(bld, day_eng, room).lectures if isinstance(bld, int) else []
+    return _timetable_response(docs[:limit] if limit else docs, wd)
+
+async def _fetch_timetable(mongo: MongoManager, bld: Union[int, str], room: str,
+                           day_eng: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+    coll = mongo.database[LECTURES_COLL]
 
     query = {"building": bld, "room": room, "day": day_eng}
     projection = {"_id": 0, "day": 1, "start_time": 1, "end_time": 1, "course_name": 1}
-    cursor = coll.find(query, projection).sort("start_time", 1)
+    if not mongo.minutes_migrated:
+        # start_min 이 없는 도큐먼트는 정렬이 안 되므로 가져와서 문자열 시각으로 정렬
+        docs = await coll.find(query, projection, max_time_ms=mongo.max_time_ms).to_list(length=1000)
+        docs.sort(key=lambda d: time_to_minutes(d["start_time"]))
+        return docs[:limit] if limit else docs
+
+    cursor = coll.find(query, projection, max_time_ms=mongo.max_time_ms).sort("start_min", 1)
     if limit:
         cursor = cursor.limit(limit)
 
-    docs = await cursor.to_list(length=limit or 1000)
+    return await cursor.to_list(length=limit or 1000)
+
+def _timetable_response(docs: List[Dict[str, Any]], wd: str) -> ORJSONResponse:
+    # TimetableItem 은 문서(response_model)용. 필드가 고정이므로 검증 없이 dict 로 바로 직렬화
+    with span("timetable.serialize"):
+        return ORJSONResponse([
+            {
+                "day": ENG2KOR.get(d.get("day"), wd),
+                "start_time": d["start_time"],
+                "end_time": d["end_time"],
+                "course_name": d.get("course_name") or "",
+            }
+            for d in docs
+        ])
 
+def _week_items(schedule: RoomSchedule) -> List[Dict[str, Any]]:
     return [
-        TimetableItem(
-            day=ENG2KOR.get(d["day"], wd),
-            start_time=d["start_time"],
-            end_time=d["end_time"],
-            course_name=d.get("course_name", ""),
-        )
-        for d in docs
-    ]
\ No newline at end of file
+        {
+            "start_time": lec["start_time"],
+            "end_time": lec["end_time"],
+            "course_name": lec.get("course_name") or "",
+        }
+        for lec in schedule.lectures
+    ]
+
+def _weekly_response(request: Request, index: OccupancyIndex, etag_key: tuple, build):
+    """데이터셋 버전 기반 ETag 로 304 를 처리하고, 아니면 build() 결과를 응답."""
+    etag = make_etag((index.version, *etag_key))
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={WEEKLY_MAX_AGE}", **VARY_HEADERS}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(build(), headers=headers)
+
+@router.get(
+    "/api/timetable/week",
+    summary="특정 강의실의 주간 시간표 조회",
+)
+async def get_weekly_timetable(
+    request: Request,
+    building: Union[int, str] = Query(..., description="건물 번호"),
+    room_number: str = Query(..., description="강의실 번호"),
+    index: OccupancyIndex = Depends(get_occupancy_index),
+):
+    """
+    요일(한글) → 수업 목록 형태로 한 주 전체를 반환. 수업이 없는 요일은 생략.
+    예) {"월": [{"start_time": "09:00", "end_time": "10:15", "course_name": "..."}], ...}
+    메모리 인덱스에서 읽으므로 DB 조회가 없다.
+    """
+    bld = _normalize_building(building)
+    room = room_number.strip()
+
+    def build():
+        week = index.week(bld) if isinstance(bld, int) else {}
+        return {
+            ENG2KOR[day]: _week_items(week[day][room])
+            for day in DAYS
+            if day in week and room in week[day]
+        }
+
+    return _weekly_response(request, index, ("week", bld, room), build)
+
+@router.get(
+    "/api/timetable/building",
+    summary="건물 전체 강의실의 주간 시간표 조회",
+)
+async def get_building_timetable(
+    request: Request,
+    building: Union[int, str] = Query(..., description="건물 번호"),
+    index: OccupancyIndex = Depends(get_occupancy_index),
+):
+    """
+    강의실 → 요일(한글) → 수업 목록. 강의실은 층 → 방이름 순, 수업이 없는 요일은 생략.
+    """
+    bld = _normalize_building(building)
+
+    def build():
+        if not isinstance(bld, int):
+            return {}
+        week = index.week(bld)
+        result: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for room in index.rooms(bld):
+            days = {
+                ENG2KOR[day]: _week_items(week[day][room])
+                for day in DAYS
+                if day in week and room in week[day]
+            }
+            if days:
+                result[room] = days
+        return result
+
+    return _weekly_response(request, index, ("building", bld), build)
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from types import SimpleNamespace
+from bson import ObjectId
+from db.mongo import CircuitBreaker
+from routes.feedback import COLL_NAME, router
+import asyncio
+import json
+import pytest
+
+TOKEN = "admin-secret"
+
+
+@pytest.fixture
+def client():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    database = mongomock_motor.AsyncMongoMockClient()["test"]
+    asyncio.run(database[COLL_NAME].insert_one({
+        "category": "bug", "message": "hello", "anonymous": False, "name": "홍길동",
+        "phone": "010-0000-0000", "created_at": datetime(2025, 9, 1, tzinfo=timezone.utc),
+    }))
+    app = FastAPI()
+    app.mongo = SimpleNamespace(breaker=CircuitBreaker(threshold=5, cooldown=30), database=database, max_time_ms=1000)
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+def test_admin_endpoints_disabled_without_admin_token(client, monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/api/feedback", headers={"x-admin-token": TOKEN}).status_code == 404
+    assert client.post("/api/feedback/export/jobs", json={}).status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/api/feedback", "/api/feedback/export/jobs/abc", "/api/feedback/export/jobs/abc/download"])
+def test_admin_endpoints_reject_wrong_token(client, monkeypatch, path):
+    monkeypatch.setenv("ADMIN_TOKEN", TOKEN)
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"x-admin-token": "wrong"}).status_code == 401
+
+
+def test_list_feedback_with_admin_token(client, monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", TOKEN)
+    response = client.get("/api/feedback", headers={"x-admin-token": TOKEN})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["name"] == "홍길동"
+
+
+def test_write_behind_accepts_feedback_while_breaker_is_open(client):
+    breaker = client.app.mongo.breaker
+    for _ in range(breaker.threshold):
+        breaker.record_failure()
+    body = {"category": "bug", "message": "hello world", "anonymous": True}
+
+    client.app.feedback_writer = None
+    assert client.post("/api/feedback", json=body).status_code == 503
+
+    queued = []
+    client.app.feedback_writer = SimpleNamespace(submit=queued.append)
+    response = client.post("/api/feedback", json=body)
+    assert response.status_code == 201
+    assert [str(doc["_id"]) for doc in queued] == [response.json()["id"]]
+
+
+@pytest.mark.parametrize("cursor", ["OTk5OTk5OTk5OTk5OTk5OTk5OTk6YWE", "not-a-cursor", "LTk5OTk5OTk5OTk5OTk5OTk5OjE"])
+def test_list_feedback_rejects_bad_cursor(client, monkeypatch, cursor):
+    monkeypatch.setenv("ADMIN_TOKEN", TOKEN)
+    response = client.get("/api/feedback", params={"cursor": cursor}, headers={"x-admin-token": TOKEN})
+    assert response.status_code == 400
+
+
+def _export_ids(client, **params):
+    response = client.get("/api/feedback/export", params={"format": "ndjson", **params})
+    if response.status_code == 404:
+        return [], None
+    return [json.loads(line)["message"] for line in response.text.splitlines()], response.headers["x-feedback-after"]
+
+
+def test_incremental_export_keeps_same_millisecond_rows(client):
+    tied = datetime(2025, 9, 2, tzinfo=timezone.utc)
+    coll = client.app.mongo.database[COLL_NAME]
+    asyncio.run(coll.insert_one({"_id": ObjectId("0" * 23 + "1"), "category": "bug", "message": "tie-1",
+                                 "anonymous": True, "created_at": tied}))
+    rows, after = _export_ids(client)
+    assert rows == ["hello", "tie-1"]
+
+    # 워터마크와 같은 밀리초, 더 큰 _id 로 나중에 보인 피드백도 다음 증분에 포함
+    asyncio.run(coll.insert_one({"_id": ObjectId("f" * 23 + "e"), "category": "bug", "message": "tie-2",
+                                 "anonymous": True, "created_at": tied}))
+    rows, after = _export_ids(client, after=after)
+    assert rows == ["tie-2"]
+    assert _export_ids(client, after=after) == ([], None)
+
+
+def test_incremental_export_waits_for_unsettled_and_queued_rows(client):
+    coll = client.app.mongo.database[COLL_NAME]
+    asyncio.run(coll.insert_one({"category": "bug", "message": "just now", "anonymous": True,
+                                 "created_at": datetime.now(timezone.utc)}))
+    rows, after = _export_ids(client)
+    assert rows == ["hello"]
+
+    # write-behind 큐에 남은 피드백보다 뒤는 내보내지 않는다
+    queued_at = datetime(2025, 9, 3, tzinfo=timezone.utc)
+    asyncio.run(coll.insert_one({"category": "bug", "message": "later", "anonymous": True,
+                                 "created_at": datetime(2025, 9, 4, tzinfo=timezone.utc)}))
+    client.app.feedback_writer = SimpleNamespace(oldest_unwritten=lambda: queued_at)
+    assert _export_ids(client, after=after) == ([], None)
+
+    client.app.feedback_writer = None
+    assert _export_ids(client, after=after)[0] == ["later"]
@@ -0,0 +1,52 @@
+from db.mongo import CircuitBreaker
+import db.mongo
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_breaker(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(db.mongo.time, "monotonic", clock)
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker, clock
+
+
+def test_half_open_lets_one_probe_through(monkeypatch):
+    breaker, clock = open_breaker(monkeypatch)
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 31
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow() and not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens(monkeypatch):
+    breaker, clock = open_breaker(monkeypatch)
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+
+def test_released_or_lost_probe_is_handed_over(monkeypatch):
+    breaker, clock = open_breaker(monkeypatch)
+    clock.now += 31
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+    # 결과를 남기지 못한 시험 요청은 cooldown 뒤 다른 요청이 이어받는다
+    clock.now += 31
+    assert breaker.allow() and not breaker.allow()
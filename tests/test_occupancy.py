@@ -0,0 +1,31 @@
+from db.mongo import LECTURES_COLL
+from utils.occupancy import OccupancyIndex, build_snapshot
+import asyncio
+import pytest
+
+LECTURE = {"building": 310, "room": "414", "day": "monday", "start_time": "13:30", "end_time": "14:45",
+           "course_name": "자료구조", "professor": "김교수"}
+
+
+def test_build_snapshot_leaves_lectures_untouched():
+    lectures = [dict(LECTURE)]
+    snapshot = build_snapshot(lectures)
+    assert lectures == [LECTURE]
+    assert snapshot.schedules[310]["monday"]["414"].starts == (810,)
+    assert snapshot.matrix.occ[0, 0, 810:885].all() and not snapshot.matrix.occ[0, 0, 885]
+
+
+def test_refresh_builds_index_from_unmigrated_documents():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    database = mongomock_motor.AsyncMongoMockClient()["test"]
+
+    async def scenario():
+        await database[LECTURES_COLL].insert_one(dict(LECTURE))
+        index = OccupancyIndex()
+        count = await index.refresh(database)
+        return index, count
+
+    index, count = asyncio.run(scenario())
+    assert count == 1 and index.source == "mongo"
+    assert index.free_rooms("monday", 13 * 60, 60, 310) == []
+    assert index.free_rooms("monday", 15 * 60, 60, 310) == [(310, "414", None)]
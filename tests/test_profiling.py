@@ -0,0 +1,48 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from routes.admin import admin_router
+from utils.profiling import ProfileRing, ProfilingMiddleware, token_matches
+
+TOKEN = "secret"
+NON_ASCII = "é".encode()  # UTF-8 바이트 그대로 헤더에 싣는다
+
+
+def make_app(sample_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    app.profiles = ProfileRing()
+    app.include_router(admin_router)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/rooms/stream")
+    async def stream():
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, ring=app.profiles, sample_rate=sample_rate, admin_token=TOKEN)
+    return app
+
+
+def test_token_matches_non_ascii_does_not_raise():
+    assert token_matches(TOKEN, NON_ASCII) is False
+    assert token_matches(TOKEN, TOKEN.encode()) is True
+    assert token_matches(None, TOKEN.encode()) is False
+    assert token_matches(TOKEN, None) is False
+
+
+def test_non_ascii_header_on_route_and_admin(monkeypatch):
+    monkeypatch.setenv("PROFILE_ADMIN_TOKEN", TOKEN)
+    client = TestClient(make_app())
+    assert client.get("/ping", headers={"x-profile-token": NON_ASCII}).status_code == 200
+    assert client.get("/admin/profiles", headers={"x-profile-token": NON_ASCII}).status_code == 404
+    assert client.get("/admin/profiles", headers={"x-profile-token": TOKEN}).status_code == 200
+
+
+def test_sse_path_is_never_profiled():
+    app = make_app(sample_rate=1.0)
+    client = TestClient(app)
+    client.get("/api/rooms/stream")
+    assert app.profiles.list() == []
+    client.get("/ping")
+    assert len(app.profiles.list()) == 1
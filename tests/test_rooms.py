@@ -0,0 +1,79 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from types import SimpleNamespace
+from db.mongo import CircuitBreaker
+from routes.rooms import router
+from utils.occupancy import OccupancyIndex
+from utils.response_cache import RoomStatusCache
+from utils.single_flight import SingleFlight
+import routes.rooms
+
+LECTURES = [
+    {"building": 310, "room": "414", "day": "monday", "start_time": "13:30", "end_time": "14:45",
+     "start_min": 810, "end_min": 885, "course_name": "자료구조", "professor": "김교수"},
+]
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.occupancy_index = OccupancyIndex()
+    app.occupancy_index.load(LECTURES, source="test")
+    app.room_cache = RoomStatusCache()
+    app.single_flight = SingleFlight()
+    app.mongo = SimpleNamespace(breaker=CircuitBreaker(), minutes_migrated=True)
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+def test_batch_rejects_non_numeric_building():
+    client = make_client()
+    body = {"queries": [
+        {"building": "310", "weekday": "월", "hour": 13, "minute": 40},
+        {"building": "abc", "weekday": "월", "hour": 13, "minute": 40},
+    ]}
+    assert client.post("/api/rooms/batch", json=body).status_code == 422
+
+
+def test_batch_numeric_building():
+    client = make_client()
+    body = {"queries": [{"building": "310", "weekday": "월", "hour": 13, "minute": 40}]}
+    response = client.post("/api/rooms/batch", json=body)
+    assert response.status_code == 200
+    (rooms,) = response.json()["results"].values()
+    assert rooms[0]["status"] == "in_use"
+
+
+def test_free_rooms_rejects_non_numeric_building():
+    client = make_client()
+    params = {"weekday": "월", "hour": 13, "minute": 0, "duration": 30}
+    assert client.get("/api/rooms/free", params={**params, "building": "abc"}).status_code == 422
+
+    response = client.get("/api/rooms/free", params={**params, "building": "310"})
+    assert response.status_code == 200
+    assert response.json()[0]["room_number"] == "414"
+
+
+ROOMS_PARAMS = {"building": "310", "weekday": "월", "hour": 13, "minute": 40}
+
+
+def test_explicit_time_is_revalidated_with_weak_etag(monkeypatch):
+    monkeypatch.setattr(routes.rooms, "now_kst", lambda: ("tuesday", 9 * 60, 0.0))
+    client = make_client()
+    response = client.get("/api/rooms", params=ROOMS_PARAMS)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    assert "Accept-Encoding" in response.headers["vary"]
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    # 압축 프록시가 W/ 를 붙이거나 뗀 값으로 재검증해도 304
+    for tag in (etag, etag[2:]):
+        revalidated = client.get("/api/rooms", params=ROOMS_PARAMS, headers={"if-none-match": tag})
+        assert revalidated.status_code == 304
+
+
+def test_now_max_age_counts_from_wall_clock(monkeypatch):
+    # 14:00:30 (월) 에 14:00 조회 → 수업 종료(14:45)까지 44분 30초
+    monkeypatch.setattr(routes.rooms, "now_kst", lambda: ("monday", 14 * 60, 30.0))
+    response = make_client().get("/api/rooms", params={**ROOMS_PARAMS, "hour": 14, "minute": 0})
+    assert response.headers["cache-control"] == f"public, max-age={44 * 60 + 30}"
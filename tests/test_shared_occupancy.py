@@ -0,0 +1,38 @@
+from utils.occupancy import OccupancyIndex
+import asyncio
+import os
+import pytest
+
+pytest.importorskip("fcntl")
+from utils.shared_occupancy import SharedOccupancy  # noqa: E402
+
+LECTURES = [
+    {"building": 310, "room": "414", "day": "monday", "start_time": "13:30", "end_time": "14:45",
+     "start_min": 810, "end_min": 885, "course_name": "자료구조", "professor": "김교수"},
+]
+
+
+def test_loader_reuses_published_snapshot_and_workers_attach():
+    name = f"vr_test_{os.getpid()}"
+
+    async def scenario():
+        loader = SharedOccupancy(OccupancyIndex(), name, ttl_seconds=600)
+        worker = SharedOccupancy(OccupancyIndex(), name, ttl_seconds=600)
+        try:
+            generation = await asyncio.to_thread(loader.publish, LECTURES, [])
+            # loader 는 공개한 스냅샷을 그대로 쓰므로 다시 붙지 않는다
+            assert loader.generation == generation and await loader.attach_latest() is None
+            assert await worker.attach_latest() == generation
+            return loader.index, worker.index
+        finally:
+            worker.stop()
+            loader.stop()
+
+    loader_index, worker_index = asyncio.run(scenario())
+    assert loader_index.version == worker_index.version
+    for index in (loader_index, worker_index):
+        assert index.free_rooms("monday", 13 * 60, 60, 310) == []
+        assert index.free_rooms("monday", 15 * 60, 60, 310) == [(310, "414", None)]
+    if os.path.isdir("/dev/shm"):
+        # 마지막 워커가 stop() 하면 세대/제어 세그먼트가 모두 지워진다
+        assert not [f for f in os.listdir("/dev/shm") if f.startswith(name)]
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+from db.mongo import LECTURES_COLL
+from main import check_minute_fields
+from routes.timetable import _fetch_timetable
+import asyncio
+import pytest
+
+# migrate_minutes.py 를 돌리기 전의 강의 도큐먼트 (start_min/end_min 없음, 'H:MM' 시각 포함)
+UNMIGRATED = [
+    {"building": 310, "room": "414", "day": "monday", "start_time": "13:30", "end_time": "14:45", "course_name": "C"},
+    {"building": 310, "room": "414", "day": "monday", "start_time": "9:00", "end_time": "10:15", "course_name": "A"},
+    {"building": 310, "room": "414", "day": "monday", "start_time": "10:30", "end_time": "11:45", "course_name": "B"},
+]
+
+
+@pytest.fixture
+def database():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    database = mongomock_motor.AsyncMongoMockClient()["test"]
+    asyncio.run(database[LECTURES_COLL].insert_many([dict(d) for d in UNMIGRATED]))
+    return database
+
+
+def test_check_minute_fields_detects_unmigrated_collection(database):
+    assert asyncio.run(check_minute_fields(database)) is False
+
+    asyncio.run(database[LECTURES_COLL].update_many({}, {"$set": {"start_min": 0, "end_min": 0}}))
+    assert asyncio.run(check_minute_fields(database)) is True
+
+
+def test_fetch_timetable_sorts_by_start_time_before_migration(database):
+    mongo = SimpleNamespace(database=database, max_time_ms=1000, minutes_migrated=False)
+    docs = asyncio.run(_fetch_timetable(mongo, 310, "414", "monday", None))
+    assert [d["course_name"] for d in docs] == ["A", "B", "C"]
+
+    docs = asyncio.run(_fetch_timetable(mongo, 310, "414", "monday", 2))
+    assert [d["course_name"] for d in docs] == ["A", "B"]
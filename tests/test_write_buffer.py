@@ -0,0 +1,60 @@
+from bson.errors import InvalidDocument
+from db.write_buffer import BatchWriter
+from pymongo.errors import AutoReconnect, BulkWriteError
+import asyncio
+
+
+class ScriptedCollection:
+    """insert_many 호출마다 errors 의 다음 항목을 던지고(None 이면 기록), 기록된 도큐먼트를 모은다."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.docs = []
+
+    async def insert_many(self, docs, ordered=True):
+        error = self.errors.pop(0) if self.errors else None
+        if callable(error):
+            error = error(docs)
+        if error is not None:
+            raise error
+        self.docs.extend(docs)
+
+
+def run_writer(coll, *docs):
+    async def scenario():
+        writer = BatchWriter(coll, max_batch=10, flush_interval=0.01, base_backoff=0.01, max_backoff=0.02)
+        writer.start()
+        for doc in docs:
+            writer.submit(doc)
+        await writer.drain(timeout=2)
+        return writer.stats()
+
+    return asyncio.run(scenario())
+
+
+def test_writer_retries_transient_errors_until_written():
+    coll = ScriptedCollection(AutoReconnect("down"), AutoReconnect("down"), AutoReconnect("down"), AutoReconnect("down"))
+    stats = run_writer(coll, {"_id": 1}, {"_id": 2})
+    assert coll.docs == [{"_id": 1}, {"_id": 2}]
+    assert stats["flushed"] == 2 and stats["failed"] == 0 and stats["retries"] == 4
+
+
+def test_writer_counts_duplicates_after_retry_as_written():
+    def partly_written(docs):
+        # 이전 시도에서 첫 도큐먼트가 이미 기록된 상태
+        coll.docs.extend(docs[1:])
+        return BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}]})
+
+    coll = ScriptedCollection(AutoReconnect("down"), partly_written)
+    stats = run_writer(coll, {"_id": 1}, {"_id": 2})
+    assert stats["flushed"] == 2 and stats["failed"] == 0
+
+
+def test_writer_drops_only_documents_that_cannot_be_written():
+    def invalid_first(docs):
+        return InvalidDocument("cannot encode object") if {"_id": 1} in docs else None
+
+    coll = ScriptedCollection(invalid_first, invalid_first)
+    stats = run_writer(coll, {"_id": 1}, {"_id": 2})
+    assert coll.docs == [{"_id": 2}]
+    assert stats == {"pending": 0, "flushed": 1, "failed": 1, "rejected": 0, "retries": 0}
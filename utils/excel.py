@@ -1,10 +1,13 @@
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font
 from openpyxl.utils import get_column_letter
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from bson import ObjectId
-from typing import Any, Dict, List, Set
+from typing import Any, BinaryIO, Dict, List, Set
+from io import StringIO
+import csv
 import json
 
 KST = ZoneInfo("Asia/Seoul")
@@ -17,6 +20,8 @@ PREFERRED_ORDER = [
     "page_url",
 ]
 
+MAX_COLUMN_WIDTH = 50
+
 def _to_cell_value(v: Any) -> Any:
     if isinstance(v, ObjectId):
         return str(v)
@@ -26,44 +31,79 @@ def _to_cell_value(v: Any) -> Any:
         return json.dumps(v, ensure_ascii=False)
     return v if v is not None else ""
 
-def _build_headers(docs: List[Dict[str, Any]]) -> List[str]:
-    all_keys: Set[str] = set()
-    for d in docs:
-        all_keys.update(d.keys())
-    ordered = [k for k in PREFERRED_ORDER if k in all_keys]
-    remaining = [k for k in sorted(all_keys - set(ordered))]
-    return ordered + remaining
-
-def _auto_fit(ws):
-    header_font = Font(bold=True)
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.alignment = Alignment(vertical="center")
-
-    for col in range(1, ws.max_column + 1):
-        max_len = 0
-        col_letter = get_column_letter(col)
-        for row in range(1, ws.max_row + 1):
-            val = ws.cell(row=row, column=col).value
-            val = "" if val is None else str(val)
-            if len(val) > max_len:
-                max_len = len(val)
-        ws.column_dimensions[col_letter].width = min(max_len + 2, 50)
-
-def make_feedback_excel(docs: List[Dict[str, Any]]) -> Workbook:
-    normalized = [{k: _to_cell_value(v) for k, v in d.items()} for d in docs]
-    headers = _build_headers(normalized)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Feedback"
-
-    ws.append(headers)
-    for d in normalized:
-        ws.append([d.get(h, "") for h in headers])
-
-    ws.freeze_panes = "A2"
-    ws.auto_filter.ref = ws.dimensions
-    _auto_fit(ws)
-
-    return wb
\ No newline at end of file
+def normalize_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: _to_cell_value(v) for k, v in doc.items()}
+
+class FeedbackSheetLayout:
+    """
+    도큐먼트를 한 건씩 observe 하면서 헤더(키 집합)와 열 너비를 누적 계산.
+    전체 행을 메모리에 올리거나 셀을 다시 읽지 않고도 헤더/너비를 정할 수 있다.
+    """
+
+    def __init__(self):
+        self._keys: Set[str] = set()
+        self._max_len: Dict[str, int] = {}
+        self.row_count = 0
+
+    def observe(self, row: Dict[str, Any]):
+        self.row_count += 1
+        for k, v in row.items():
+            self._keys.add(k)
+            n = len(str(v))
+            if n > self._max_len.get(k, 0):
+                self._max_len[k] = n
+
+    @property
+    def headers(self) -> List[str]:
+        ordered = [k for k in PREFERRED_ORDER if k in self._keys]
+        remaining = [k for k in sorted(self._keys - set(ordered))]
+        return ordered + remaining
+
+    def width(self, header: str) -> int:
+        return min(max(len(header), self._max_len.get(header, 0)) + 2, MAX_COLUMN_WIDTH)
+
+class FeedbackXlsxWriter:
+    """openpyxl write-only 모드로 행을 하나씩 기록하는 Excel 작성기."""
+
+    def __init__(self, layout: FeedbackSheetLayout):
+        self.headers = layout.headers
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet("Feedback")
+
+        # write-only 모드에서는 열 너비/틀 고정/필터를 첫 행 기록 전에 지정해야 함
+        for col, header in enumerate(self.headers, start=1):
+            self.ws.column_dimensions[get_column_letter(col)].width = layout.width(header)
+        self.ws.freeze_panes = "A2"
+        if self.headers:
+            last_col = get_column_letter(len(self.headers))
+            self.ws.auto_filter.ref = f"A1:{last_col}{layout.row_count + 1}"
+
+        header_font = Font(bold=True)
+        header_alignment = Alignment(vertical="center")
+        header_cells = []
+        for header in self.headers:
+            cell = WriteOnlyCell(self.ws, value=header)
+            cell.font = header_font
+            cell.alignment = header_alignment
+            header_cells.append(cell)
+        self.ws.append(header_cells)
+
+    def append(self, row: Dict[str, Any]):
+        self.ws.append([row.get(h, "") for h in self.headers])
+
+    def extend(self, rows: List[Dict[str, Any]]):
+        """여러 행을 한 번에 기록 (asyncio.to_thread 로 배치 단위 호출용)."""
+        for row in rows:
+            self.append(row)
+
+    def save(self, fileobj: BinaryIO):
+        self.wb.save(fileobj)
+
+def csv_chunk(rows: List[List[Any]]) -> str:
+    """행 목록을 CSV 텍스트 조각으로 변환."""
+    buf = StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+def ndjson_line(row: Dict[str, Any]) -> str:
+    return json.dumps(row, ensure_ascii=False) + "\n"
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+from datetime import datetime
+from fastapi import Request
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+from zoneinfo import ZoneInfo
+import asyncio
+import os
+import shutil
+import tempfile
+import uuid
+
+KST = ZoneInfo("Asia/Seoul")
+
+DEFAULT_MAX_ARTIFACTS = 8
+DEFAULT_MAX_JOBS = 100
+
+# build(path) -> 기록한 행 수. path 에 파일을 완성해 두어야 한다
+BuildFn = Callable[[str], Awaitable[int]]
+
+
+class ExportJob:
+    __slots__ = ("id", "key", "format", "filename", "status", "rows", "path", "error", "cached",
+                 "created_at", "finished_at", "meta")
+
+    def __init__(self, key: Hashable, format: str, filename: str, meta: Optional[Dict[str, str]] = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.format = format
+        self.filename = filename
+        self.status = "pending"  # pending | running | done | failed
+        self.rows: Optional[int] = None
+        self.path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.cached = False
+        self.created_at = datetime.now(KST)
+        self.finished_at: Optional[datetime] = None
+        self.meta = meta or {}  # 다운로드 응답에 실을 헤더 (예: X-Feedback-Until)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "format": self.format,
+            "status": self.status,
+            "rows": self.rows,
+            "cached": self.cached,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class _Artifact:
+    __slots__ = ("path", "rows")
+
+    def __init__(self, path: str, rows: int):
+        self.path = path
+        self.rows = rows
+
+
+class ExportJobManager:
+    """
+    내보내기 파일을 백그라운드 작업으로 만들고, 완성된 파일(artifact)을 key 별로 캐시.
+    - key 는 호출 측이 정함 (피드백은 형식, 하한, 상한 (created_at, _id)). 같은 key 면 다시 만들지 않음
+    - 같은 key 로 진행 중인 작업이 있으면 새로 시작하지 않고 그 작업을 돌려줌
+    - artifact 는 최근 max_artifacts 개만 디스크에 유지
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_artifacts: int = DEFAULT_MAX_ARTIFACTS,
+                 max_jobs: int = DEFAULT_MAX_JOBS):
+        self._own_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="feedback_export_")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_artifacts = max_artifacts
+        self.max_jobs = max_jobs
+        self._artifacts: "OrderedDict[Hashable, _Artifact]" = OrderedDict()
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._running: Dict[Hashable, ExportJob] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _register(self, job: ExportJob) -> ExportJob:
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def submit(self, key: Hashable, format: str, filename: str, build: BuildFn,
+               meta: Optional[Dict[str, str]] = None) -> ExportJob:
+        artifact = self._artifacts.get(key)
+        if artifact is not None and os.path.exists(artifact.path):
+            self._artifacts.move_to_end(key)
+            job = ExportJob(key, format, filename, meta)
+            job.status, job.cached, job.path, job.rows = "done", True, artifact.path, artifact.rows
+            job.finished_at = job.created_at
+            return self._register(job)
+
+        running = self._running.get(key)
+        if running is not None:
+            return running
+
+        job = self._register(ExportJob(key, format, filename, meta))
+        self._running[key] = job
+        task = asyncio.create_task(self._run(job, build))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: ExportJob, build: BuildFn):
+        job.status = "running"
+        path = os.path.join(self.directory, f"{job.id}.{job.format}")
+        try:
+            rows = await build(path)
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            print("피드백 내보내기 작업 실패:", job.error)
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            job.status, job.rows, job.path = "done", rows, path
+            self._store(job.key, _Artifact(path, rows))
+        finally:
+            job.finished_at = datetime.now(KST)
+            self._running.pop(job.key, None)
+
+    def _store(self, key: Hashable, artifact: _Artifact):
+        self._artifacts[key] = artifact
+        self._artifacts.move_to_end(key)
+        while len(self._artifacts) > self.max_artifacts:
+            _, old = self._artifacts.popitem(last=False)
+            if os.path.exists(old.path):
+                os.remove(old.path)
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"jobs": len(self._jobs), "running": len(self._running), "artifacts": len(self._artifacts)}
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._own_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def get_export_jobs(request: Request) -> ExportJobManager:
+    return request.app.export_jobs
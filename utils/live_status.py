@@ -0,0 +1,142 @@
+from datetime import datetime
+from fastapi import Request
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+import asyncio
+
+from utils.occupancy import DAYS, OccupancyIndex
+
+KST = ZoneInfo("Asia/Seoul")
+
+MAX_SLEEP_SECONDS = 300  # 경계가 없어도 이 간격으로 재계산 (인덱스 갱신/자정 반영)
+SUBSCRIBER_QUEUE_SIZE = 16
+
+GroupKey = Tuple[str, Optional[str]]  # (building, floor)
+# (building, day, target_min, floor) -> build_room_statuses 결과
+ComputeFn = Callable[[str, str, int, Optional[str]], List[Dict[str, Any]]]
+
+
+def now_kst() -> Tuple[str, int, float]:
+    """(영문 요일, 자정 기준 분, 분 안에서 지난 초)"""
+    now = datetime.now(KST)
+    return DAYS[now.weekday()], now.hour * 60 + now.minute, now.second + now.microsecond / 1e6
+
+
+def _state(item: Dict[str, Any]) -> tuple:
+    """변경 판단 기준. available_minutes 처럼 매분 바뀌는 값은 제외."""
+    return item["status"], item["current_lecture"], item["next_lecture"]
+
+
+class _Group:
+    __slots__ = ("subscribers", "last")
+
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.last: Dict[str, tuple] = {}
+
+
+class RoomStatusBroadcaster:
+    """
+    (건물, 층) 단위 구독자에게 강의실 상태 변화를 전달.
+    모든 구독을 하나의 타이머가 처리하며, 구독 중인 건물 중 가장 가까운
+    수업 시작/종료(및 시작 SOON_THRESHOLD 분 전) 시각에만 깨어나 바뀐 방만 보낸다.
+    """
+
+    def __init__(self, index: OccupancyIndex, compute: ComputeFn, soon_threshold: int):
+        self.index = index
+        self.compute = compute
+        self.soon_threshold = soon_threshold
+        self._groups: Dict[GroupKey, _Group] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._reschedule = asyncio.Event()
+
+    def subscribe(self, building: str, floor: Optional[str]) -> Tuple[asyncio.Queue, List[Dict[str, Any]]]:
+        """구독 등록 후 (이벤트 큐, 현재 전체 상태)를 반환."""
+        key = (building, floor)
+        day, minute, _ = now_kst()
+        snapshot = self.compute(building, day, minute, floor)
+
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _Group()
+            group.last = {item["room_number"]: _state(item) for item in snapshot}
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        group.subscribers.add(queue)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        else:
+            self._reschedule.set()
+        return queue, snapshot
+
+    def unsubscribe(self, building: str, floor: Optional[str], queue: asyncio.Queue):
+        key = (building, floor)
+        group = self._groups.get(key)
+        if group is None:
+            return
+        group.subscribers.discard(queue)
+        if not group.subscribers:
+            del self._groups[key]
+
+    def _next_change(self, building: str, day: str, minute: int) -> Optional[int]:
+        """다음 상태 변화 후보 분: 수업 시작/종료 또는 시작 soon_threshold 분 전."""
+        bld = int(building)
+        candidates = [self.index.next_boundary(bld, day, minute)]
+        soon = self.index.next_boundary(bld, day, minute + self.soon_threshold)
+        if soon is not None:
+            candidates.append(soon - self.soon_threshold)
+        candidates = [c for c in candidates if c is not None]
+        return min(candidates) if candidates else None
+
+    def _tick(self, day: str, minute: int):
+        for (building, floor), group in list(self._groups.items()):
+            items = self.compute(building, day, minute, floor)
+            changed = []
+            for item in items:
+                state = _state(item)
+                if group.last.get(item["room_number"]) != state:
+                    changed.append(item)
+            group.last = {item["room_number"]: _state(item) for item in items}
+            if not changed:
+                continue
+
+            for queue in list(group.subscribers):
+                try:
+                    queue.put_nowait(("update", changed))
+                except asyncio.QueueFull:
+                    # 느린 구독자는 쌓인 변경분을 버리고 전체 상태로 다시 맞춘다
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(("snapshot", items))
+
+    async def _run(self):
+        while self._groups:
+            day, minute, seconds = now_kst()
+            self._tick(day, minute)
+
+            changes = [self._next_change(b, day, minute) for b, _ in self._groups]
+            changes = [c for c in changes if c is not None]
+            delay = MAX_SLEEP_SECONDS
+            if changes:
+                delay = min(delay, (min(changes) - minute) * 60 - seconds + 0.5)
+
+            self._reschedule.clear()
+            try:
+                await asyncio.wait_for(self._reschedule.wait(), timeout=max(delay, 0.5))
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "groups": len(self._groups),
+            "subscribers": sum(len(g.subscribers) for g in self._groups.values()),
+        }
+
+
+def get_broadcaster(request: Request) -> RoomStatusBroadcaster:
+    return request.app.room_broadcaster
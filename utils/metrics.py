@@ -0,0 +1,192 @@
+"""
+Prometheus 텍스트 형식(/metrics)으로 내보내는 가벼운 메트릭.
+- MetricsMiddleware: 라우트별 요청 지연 히스토그램 + 요청 단위 stage 타이밍(Server-Timing 헤더)
+- span(stage): 핸들러 안의 구간 시간을 재는 컨텍스트 매니저
+- Mongo 명령 수/반환 도큐먼트 수는 db/mongo.CommandMetrics 가 여기 카운터에 기록
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import threading
+import time
+
+# 초 단위 히스토그램 버킷 상한
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()  # Mongo 이벤트는 pymongo 워커 스레드에서도 호출됨
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> (버킷별 개수(누적 아님), 합계, 개수)
+        self._series: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for upper, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="%g"' % upper
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "app_stage_duration_seconds", "Time spent in handler stages (span).",
+    ("stage",),
+)
+MONGO_COMMANDS = Counter(
+    "mongodb_commands_total", "MongoDB commands by name and outcome.",
+    ("command", "outcome"),
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round-trip time.",
+    ("command",),
+)
+MONGO_DOCUMENTS = Counter(
+    "mongodb_documents_returned_total", "Documents returned by find/aggregate/getMore/distinct.",
+    ("command",),
+)
+
+REGISTRY = (REQUEST_SECONDS, STAGE_SECONDS, MONGO_COMMANDS, MONGO_COMMAND_SECONDS, MONGO_DOCUMENTS)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# 현재 요청의 stage 별 누적 시간(초). MetricsMiddleware 가 요청마다 새 dict 를 넣는다
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    with span("rooms.build"): ... 구간 시간을 app_stage_duration_seconds 에 기록하고,
+    응답 헤더를 보내기 전에 끝난 구간은 Server-Timing 헤더에도 싣는다.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + elapsed
+
+
+def _server_timing(stages: Dict[str, float]) -> bytes:
+    return ", ".join(
+        f"{name.replace('.', '-')};dur={seconds * 1000:.2f}" for name, seconds in stages.items()
+    ).encode("latin-1")
+
+
+class MetricsMiddleware:
+    """
+    순수 ASGI 미들웨어 (스트리밍 응답을 버퍼링하지 않음).
+    라우트 라벨은 매칭된 경로 템플릿(예: /api/rooms)이라 쿼리/경로 값으로 라벨이 늘어나지 않는다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages: Dict[str, float] = {}
+        token = _request_stages.set(stages)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if stages:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stages)))
+                    message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stages.reset(token)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], _route_label(scope), str(status))
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    # FastAPI 버전에 따라 route.path 에 include_router prefix 가 빠져 있으므로,
+    # 경로 파라미터가 없는 라우트는 실제 경로(= 템플릿)를 그대로 쓴다
+    return path if "{" in path else scope["path"]
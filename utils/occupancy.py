@@ -0,0 +1,368 @@
+from fastapi import Request
+import asyncio
+import hashlib
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from db.mongo import LECTURES_COLL, ROOMS_COLL
+from utils.room_utils import extract_floor, room_sort_key
+from utils.time_utils import lecture_minutes
+
+# 인덱스 적재 시 가져올 필드 (응답에 쓰이는 값만)
+LECTURE_PROJECTION = {
+    "_id": 0,
+    "building": 1, "room": 1, "day": 1,
+    "start_time": 1, "end_time": 1,
+    "start_min": 1, "end_min": 1,
+    "course_name": 1, "professor": 1,
+}
+
+CATALOG_PROJECTION = {"_id": 0, "building": 1, "room": 1, "floor": 1}
+CATALOG_SORT = [("building", 1), ("sort_key", 1)]
+
+DEFAULT_TTL_SECONDS = 600
+SNAPSHOT_RETRY_SECONDS = 30  # 바이너리 스냅샷으로 떠 있는 동안 Mongo 재적재를 시도하는 간격
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MINUTES_PER_DAY = 24 * 60
+
+
+class RoomSchedule:
+    """
+    한 강의실의 하루 수업을 시작 시각 순으로 정렬해 둔 배열 묶음.
+    starts/ends 는 자정 기준 분(start_min/end_min), max_ends 는 ends 의 누적 최댓값.
+    """
+    __slots__ = ("starts", "ends", "max_ends", "lectures")
+
+    def __init__(self, lectures: List[Dict[str, Any]]):
+        self.lectures: Tuple[Dict[str, Any], ...] = tuple(lectures)
+        self.starts: Tuple[int, ...] = tuple(lec["start_min"] for lec in lectures)
+        self.ends: Tuple[int, ...] = tuple(lec["end_min"] for lec in lectures)
+
+        max_ends: List[int] = []
+        running = -1
+        for end in self.ends:
+            running = max(running, end)
+            max_ends.append(running)
+        self.max_ends: Tuple[int, ...] = tuple(max_ends)
+
+    def lookup(self, target_min: int) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        target_min(자정 기준 분) 기준 (현재 수업, 이후 수업 목록)을 반환.
+        - 현재 수업: start_min <= t < end_min 인 것 중 가장 늦게 시작한 수업
+        - 이후 수업: start_min > t
+        """
+        i = bisect_right(self.starts, target_min)
+
+        current = None
+        if i and self.max_ends[i - 1] > target_min:
+            for j in range(i - 1, -1, -1):
+                if self.ends[j] > target_min:
+                    current = self.lectures[j]
+                    break
+
+        return current, list(self.lectures[i:])
+
+
+EMPTY_SCHEDULE = RoomSchedule([])
+
+
+class OccupancyMatrix:
+    """
+    캠퍼스 전체 강의실 × 하루 분(0~1439) 점유 여부를 요일별로 담은 bool 행렬.
+    occ[day, row, minute] 이 True 면 그 분에 수업 중 (start_min <= minute < end_min).
+    행(row) 순서는 건물 번호 → 층 → 방이름. spans 는 강의별 (building, room, day, start_min, end_min).
+    occ 를 넘기면(예: 다른 프로세스가 shared_memory 에 채워 둔 읽기 전용 배열) 새로 채우지 않고 그대로 쓴다.
+    """
+    __slots__ = ("occ", "buildings", "floors", "room_names", "owner")
+
+    def __init__(self, rooms: Dict[int, List[str]], spans: List[Tuple[int, str, str, int, int]],
+                 occ: Optional[np.ndarray] = None, owner: Any = None):
+        self.room_names: List[str] = []
+        buildings: List[int] = []
+        floors: List[str] = []
+        row_of: Dict[Tuple[int, str], int] = {}
+        for building in sorted(rooms):
+            for room in rooms[building]:
+                row_of[(building, room)] = len(self.room_names)
+                self.room_names.append(room)
+                buildings.append(building)
+                floors.append(extract_floor(room))
+
+        self.buildings = np.array(buildings, dtype=np.int64)
+        self.floors = np.array(floors, dtype=object)
+        # occ 가 가리키는 버퍼의 소유자(공유 메모리 세그먼트 등). 행렬이 살아 있는 동안 함께 유지
+        self.owner = owner
+        shape = (len(DAYS), len(self.room_names), MINUTES_PER_DAY)
+        if occ is not None and occ.shape == shape:
+            self.occ = occ
+            return
+        self.occ = np.zeros(shape, dtype=bool)
+
+        day_pos = {day: i for i, day in enumerate(DAYS)}
+        for building, room, day, start_min, end_min in spans:
+            d = day_pos.get(day)
+            if d is None:
+                continue
+            start = min(start_min, MINUTES_PER_DAY)
+            end = min(end_min, MINUTES_PER_DAY)
+            self.occ[d, row_of[(building, room)], start:end] = True
+
+    def free_rooms(self, day: str, start: int, duration: int,
+                   building: Optional[int] = None,
+                   floor: Optional[str] = None) -> List[Tuple[int, str, Optional[int]]]:
+        """
+        start 분(0~1439)부터 duration 분 이상 비어 있는 강의실을 (건물, 방, 다음 수업까지 남은 분) 목록으로 반환.
+        남은 분은 그날 남은 수업이 없으면 None. 자정을 넘는 duration 은 자정까지만 확인.
+        """
+        mask = np.ones(len(self.room_names), dtype=bool)
+        if building is not None:
+            mask &= self.buildings == building
+        if floor:
+            mask &= self.floors == floor
+        rows = np.flatnonzero(mask)
+
+        # 각 행에서 start 이후 처음으로 점유된 분을 한 번에 계산
+        window = self.occ[DAYS.index(day)][rows, start:]
+        first_busy = window.argmax(axis=1)
+        has_busy = window[np.arange(len(rows)), first_busy]
+        free_for = np.where(has_busy, first_busy, MINUTES_PER_DAY - start)
+
+        hit = free_for >= min(duration, MINUTES_PER_DAY - start)
+        return [
+            (int(self.buildings[r]), self.room_names[r], int(f) if busy else None)
+            for r, f, busy in zip(rows[hit], free_for[hit], has_busy[hit])
+        ]
+
+
+class _Snapshot:
+    """refresh 한 번에 만들어지는 불변 데이터. 통째로 교체된다."""
+    __slots__ = ("schedules", "rooms", "rooms_by_floor", "boundaries", "matrix", "version",
+                 "lecture_count", "loaded_at")
+
+    def __init__(self,
+                 schedules: Dict[int, Dict[str, Dict[str, RoomSchedule]]],
+                 rooms: Dict[int, List[str]],
+                 rooms_by_floor: Dict[int, Dict[str, List[str]]],
+                 boundaries: Dict[int, Dict[str, List[int]]],
+                 matrix: OccupancyMatrix,
+                 version: str,
+                 lecture_count: int):
+        self.schedules = schedules    # building -> day -> room -> RoomSchedule
+        self.rooms = rooms            # building -> 층/방이름 순으로 정렬된 전체 방 목록
+        self.rooms_by_floor = rooms_by_floor  # building -> floor -> 정렬된 방 목록
+        self.boundaries = boundaries  # building -> day -> 수업 시작/종료 분(정렬, 중복 제거)
+        self.matrix = matrix
+        self.version = version        # 시간표 내용 해시 (내용이 같으면 재적재해도 동일)
+        self.lecture_count = lecture_count
+        self.loaded_at = time.monotonic()
+
+
+def _lecture_sort_key(lec: Dict[str, Any]) -> Tuple:
+    return (
+        lec["building"], lec["room"], lec["day"], lec["start_time"], lec["end_time"],
+        lec.get("course_name") or "", lec.get("professor") or "",
+    )
+
+
+def _build_room_lists(room_sets: Dict[int, set],
+                      catalog: List[Dict[str, Any]]) -> Tuple[Dict[int, List[str]], Dict[int, Dict[str, List[str]]]]:
+    """
+    건물별 정렬된 방 목록과 층별 방 목록.
+    카탈로그(building, sort_key 순으로 조회)가 있으면 그 순서를 그대로 쓰고,
+    카탈로그에 없는 방(적재 직후 등)만 room_sort_key 로 정렬해 합친다.
+    """
+    rooms: Dict[int, List[str]] = defaultdict(list)
+    floors: Dict[Tuple[int, str], str] = {}
+    for doc in catalog:
+        rooms[doc["building"]].append(doc["room"])
+        floors[(doc["building"], doc["room"])] = doc["floor"]
+
+    for building, rs in room_sets.items():
+        missing = {r for r in rs if (building, r) not in floors}
+        if missing:
+            rooms[building] = sorted(set(rooms[building]) | missing, key=room_sort_key)
+
+    by_floor: Dict[int, Dict[str, List[str]]] = {}
+    for building, rs in rooms.items():
+        grouped: Dict[str, List[str]] = defaultdict(list)
+        for r in rs:
+            grouped[floors.get((building, r)) or extract_floor(r)].append(r)
+        by_floor[building] = dict(grouped)
+
+    return dict(rooms), by_floor
+
+
+def build_snapshot(lectures: List[Dict[str, Any]],
+                   catalog: Optional[List[Dict[str, Any]]] = None,
+                   occ: Optional[np.ndarray] = None,
+                   owner: Any = None) -> _Snapshot:
+    """
+    강의 목록으로 인덱스 스냅샷을 만든다. lectures 는 읽기만 하므로 (분 단위 값은 새 dict/튜플에 담음)
+    OccupancyIndex.refresh 처럼 다른 스레드에서 만들어도 된다.
+    """
+    grouped: Dict[int, Dict[str, Dict[str, List[Dict[str, Any]]]]] = defaultdict(
+        lambda: defaultdict(lambda: defaultdict(list))
+    )
+    room_sets: Dict[int, set] = defaultdict(set)
+    boundary_sets: Dict[int, Dict[str, set]] = defaultdict(lambda: defaultdict(set))
+    spans: List[Tuple[int, str, str, int, int]] = []
+    digest = hashlib.sha1()
+
+    for key in sorted(map(_lecture_sort_key, lectures)):
+        digest.update(repr(key).encode("utf-8"))
+
+    for lec in lectures:
+        building = lec["building"]
+        # 정수 분은 적재 시 한 번만 계산 (요청마다 문자열 파싱/비교 없음)
+        start_min, end_min = lecture_minutes(lec)
+        spans.append((building, lec["room"], lec["day"], start_min, end_min))
+        boundary_sets[building][lec["day"]].update((start_min, end_min))
+        grouped[building][lec["day"]][lec["room"]].append({
+            "course_name": lec.get("course_name"),
+            "start_time": lec["start_time"],
+            "end_time": lec["end_time"],
+            "professor": lec.get("professor"),
+            "start_min": start_min,
+            "end_min": end_min,
+        })
+        room_sets[building].add(lec["room"])
+
+    schedules: Dict[int, Dict[str, Dict[str, RoomSchedule]]] = {}
+    for building, days in grouped.items():
+        schedules[building] = {
+            day: {
+                room: RoomSchedule(sorted(lecs, key=lambda lec: lec["start_min"]))
+                for room, lecs in room_map.items()
+            }
+            for day, room_map in days.items()
+        }
+
+    rooms, rooms_by_floor = _build_room_lists(room_sets, catalog or [])
+    boundaries = {
+        b: {day: sorted(times) for day, times in days.items()}
+        for b, days in boundary_sets.items()
+    }
+    return _Snapshot(schedules, rooms, rooms_by_floor, boundaries, OccupancyMatrix(rooms, spans, occ, owner),
+                     digest.hexdigest(), len(lectures))
+
+
+async def fetch_timetable(db) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """인덱스 적재에 필요한 (강의 목록, 강의실 카탈로그)를 DB에서 읽는다."""
+    lectures = await db[LECTURES_COLL].find({}, LECTURE_PROJECTION).to_list(length=None)
+    catalog = await db[ROOMS_COLL].find({}, CATALOG_PROJECTION).sort(CATALOG_SORT).to_list(length=None)
+    return lectures, catalog
+
+
+class OccupancyIndex:
+    """
+    2025_2_lectures 전체를 메모리에 올려 두고 /api/rooms 를 DB 조회 없이 응답하기 위한 인덱스.
+    - main.lifespan 에서 최초 적재(refresh)
+    - 이후 run_refresher 가 ttl_seconds 간격으로 재적재 (또는 refresh 를 직접 호출)
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = asyncio.Lock()
+        self.source: Optional[str] = None  # "mongo" 또는 바이너리 스냅샷 경로
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def version(self) -> str:
+        return self._require().version
+
+    @property
+    def lecture_count(self) -> int:
+        return self._snapshot.lecture_count if self._snapshot else 0
+
+    async def refresh(self, db) -> int:
+        """
+        DB에서 시간표를 다시 읽어 인덱스를 원자적으로 교체. 적재한 강의 수를 반환.
+        스냅샷 생성(정렬/점유 행렬 채우기)은 스레드에서 돌려 그동안에도 이벤트 루프가 요청을 처리한다.
+        """
+        async with self._lock:
+            lectures, catalog = await fetch_timetable(db)
+            snapshot = await asyncio.to_thread(build_snapshot, lectures, catalog)
+            self.install(snapshot, "mongo")
+            return len(lectures)
+
+    def load(self, lectures: List[Dict[str, Any]],
+             catalog: Optional[List[Dict[str, Any]]] = None,
+             source: str = "mongo",
+             occ: Optional[np.ndarray] = None,
+             owner: Any = None) -> int:
+        """
+        이미 읽어 둔 강의 목록으로 인덱스를 교체 (바이너리 스냅샷/공유 메모리 적재용).
+        occ, owner 는 OccupancyMatrix 참고.
+        """
+        self.install(build_snapshot(lectures, catalog, occ, owner), source)
+        return len(lectures)
+
+    def install(self, snapshot: _Snapshot, source: str):
+        """미리 만들어 둔 스냅샷(build_snapshot)으로 교체. 스냅샷은 다른 스레드에서 만들어도 된다."""
+        self._snapshot = snapshot
+        self.source = source
+
+    async def run_refresher(self, db):
+        """
+        ttl_seconds 마다 refresh. 실패하면 기존 스냅샷을 유지하고 다음 주기에 재시도.
+        바이너리 스냅샷에서 적재된 상태라면 SNAPSHOT_RETRY_SECONDS 간격으로 더 자주 시도.
+        """
+        while True:
+            delay = self.ttl_seconds
+            if self.source != "mongo":
+                delay = min(delay, SNAPSHOT_RETRY_SECONDS)
+            await asyncio.sleep(delay)
+            try:
+                count = await self.refresh(db)
+                print(f"occupancy 인덱스 갱신 완료 ({count}개 강의)")
+            except Exception as e:
+                print("occupancy 인덱스 갱신 실패:", e)
+
+    def _require(self) -> _Snapshot:
+        if self._snapshot is None:
+            raise RuntimeError("occupancy index is not loaded")
+        return self._snapshot
+
+    def rooms(self, building: int, floor: Optional[str] = None) -> List[str]:
+        """건물(＋층)에 존재하는 모든 방 목록(요일 무관), 층 → 방이름 순. 층은 정확히 일치해야 함."""
+        snap = self._require()
+        if floor:
+            return snap.rooms_by_floor.get(building, {}).get(floor, [])
+        return snap.rooms.get(building, [])
+
+    def next_boundary(self, building: int, day: str, target_min: int) -> Optional[int]:
+        """target_min 이후 그 건물에서 처음으로 수업이 시작/종료되는 분. 없으면 None."""
+        times = self._require().boundaries.get(building, {}).get(day, [])
+        i = bisect_right(times, target_min)
+        return times[i] if i < len(times) else None
+
+    def free_rooms(self, day: str, start: int, duration: int,
+                   building: Optional[int] = None,
+                   floor: Optional[str] = None) -> List[Tuple[int, str, Optional[int]]]:
+        """OccupancyMatrix.free_rooms 참고."""
+        return self._require().matrix.free_rooms(day, start, duration, building, floor)
+
+    def week(self, building: int) -> Dict[str, Dict[str, RoomSchedule]]:
+        """건물의 요일 → 강의실 → 스케줄 (주간 시간표용)."""
+        return self._require().schedules.get(building, {})
+
+    def schedule(self, building: int, day: str, room: str) -> RoomSchedule:
+        """해당 요일의 강의실 스케줄. 수업이 없으면 빈 스케줄."""
+        return (
+            self._require().schedules
+            .get(building, {})
+            .get(day, {})
+            .get(room, EMPTY_SCHEDULE)
+        )
+
+
+def get_occupancy_index(request: Request) -> OccupancyIndex:
+    return request.app.occupancy_index
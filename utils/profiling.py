@@ -0,0 +1,213 @@
+"""
+요청 단위 cProfile 프로파일링 (기본 꺼짐).
+- PROFILE_SAMPLE_RATE(0~1) 비율로 무작위 요청을, 또는 X-Profile-Token 헤더가 PROFILE_ADMIN_TOKEN 과
+  같은 요청을 프로파일링해 최근 N 개를 메모리 링에 보관 (routes/admin.py 에서 조회)
+- 둘 다 설정하지 않으면 main.py 가 미들웨어를 아예 붙이지 않으므로 오버헤드가 없다
+- cProfile 은 스레드 단위라 같은 이벤트 루프에서 동시에 돈 다른 요청의 코드도 섞일 수 있고,
+  한 번에 하나의 요청만 프로파일링한다
+"""
+from collections import deque
+from datetime import datetime
+from fastapi import Request
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import cProfile
+import hmac
+import itertools
+import marshal
+import random
+import time
+
+KST = ZoneInfo("Asia/Seoul")
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+MAX_STACK_DEPTH = 64
+
+FuncKey = Tuple[str, int, str]  # (파일, 줄, 함수명) — pstats 키
+
+
+# 스트리밍(SSE) 경로. 연결이 끝나지 않아 프로파일 자리를 계속 차지하므로 Accept 헤더와 무관하게 제외
+SSE_PATHS = ("/api/rooms/stream",)
+
+
+def token_matches(expected: Optional[str], given: Optional[bytes]) -> bool:
+    """
+    헤더 원본 바이트와 비교. str 끼리 compare_digest 하면 비 ASCII 문자가 섞인 헤더에서 TypeError 가 나므로
+    expected 를 UTF-8 로 인코딩해 바이트끼리 비교한다.
+    """
+    return bool(expected) and given is not None and hmac.compare_digest(expected.encode(), given)
+
+
+class Profile:
+    __slots__ = ("id", "method", "path", "query", "status", "duration_ms", "created_at", "trigger", "stats")
+
+    def __init__(self, id: int, method: str, path: str, query: str, status: int,
+                 duration_ms: float, trigger: str, stats: Dict[FuncKey, tuple]):
+        self.id = id
+        self.method = method
+        self.path = path
+        self.query = query
+        self.status = status
+        self.duration_ms = duration_ms
+        self.created_at = datetime.now(KST)
+        self.trigger = trigger  # "header" | "sample"
+        self.stats = stats      # cProfile.Profile.stats (pstats 와 같은 구조)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 2),
+            "created_at": self.created_at.isoformat(),
+            "trigger": self.trigger,
+        }
+
+    def pstats_bytes(self) -> bytes:
+        """pstats.Stats.dump_stats 와 같은 형식 (python -m pstats, snakeviz 등으로 열 수 있음)."""
+        return marshal.dumps(self.stats)
+
+    def speedscope(self) -> Dict[str, Any]:
+        """
+        speedscope(https://www.speedscope.app) JSON.
+        cProfile 은 호출 트리 대신 함수별 (호출자 → 시간) 만 남기므로, 각 함수의 자기 시간(tottime)을
+        누적 시간이 가장 큰 호출자를 따라 올라간 스택에 싣는 근사 flame graph 를 만든다.
+        """
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[FuncKey, int] = {}
+
+        def frame(key: FuncKey) -> int:
+            i = frame_index.get(key)
+            if i is None:
+                file, line, name = key
+                i = frame_index[key] = len(frames)
+                frames.append({"name": name, "file": file, "line": line})
+            return i
+
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for key, (_, _, tottime, _, callers) in self.stats.items():
+            if tottime <= 0:
+                continue
+            stack = [key]
+            seen = {key}
+            while callers and len(stack) < MAX_STACK_DEPTH:
+                caller = max(callers, key=lambda c: callers[c][3])
+                if caller in seen or caller not in self.stats:
+                    break
+                stack.append(caller)
+                seen.add(caller)
+                callers = self.stats[caller][4]
+            samples.append([frame(k) for k in reversed(stack)])
+            weights.append(tottime)
+
+        total = sum(weights)
+        name = f"{self.method} {self.path} #{self.id}"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "vacant-room-backend",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+class ProfileRing:
+    """최근 max_entries 개 프로파일만 보관하는 링 버퍼."""
+
+    def __init__(self, max_entries: int = 20):
+        self._profiles: Deque[Profile] = deque(maxlen=max_entries)
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: Profile):
+        self._profiles.append(profile)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [p.summary() for p in reversed(self._profiles)]
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        for p in self._profiles:
+            if p.id == profile_id:
+                return p
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    순수 ASGI 미들웨어. 헤더 토큰이 맞거나 sample_rate 확률에 걸린 요청을 cProfile 로 감싼다.
+    이미 다른 요청을 프로파일링 중이면 건너뛴다 (cProfile 은 스레드당 하나).
+    """
+
+    def __init__(self, app, ring: ProfileRing, sample_rate: float = 0.0, admin_token: Optional[str] = None):
+        self.app = app
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+        self._active = False
+
+    def _trigger(self, scope) -> Optional[str]:
+        if scope["path"].startswith("/admin/"):
+            return None  # 프로파일 조회 요청 자체는 기록하지 않음
+        if scope["path"] in SSE_PATHS:
+            return None
+        headers = dict(scope["headers"])
+        if b"text/event-stream" in headers.get(b"accept", b""):
+            return None  # SSE 는 연결이 끝나지 않아 프로파일 자리를 계속 차지함
+        if self.admin_token:
+            token = headers.get(PROFILE_TOKEN_HEADER.encode())
+            if token is not None:
+                return "header" if token_matches(self.admin_token, token) else None
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active = False
+            profiler.create_stats()
+            self.ring.add(Profile(
+                self.ring.next_id(), scope["method"], scope["path"],
+                scope.get("query_string", b"").decode("latin-1"), status,
+                (time.perf_counter() - started) * 1000, trigger, profiler.stats,
+            ))
+
+
+def get_profile_ring(request: Request) -> Optional[ProfileRing]:
+    return getattr(request.app, "profiles", None)
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from fastapi import Request
+from typing import Optional, Tuple
+import hashlib
+import time
+
+DEFAULT_MAX_ENTRIES = 2048
+MAX_AGE_CAP_SECONDS = 3600
+
+CacheKey = Tuple[str, str, Optional[str], str, str, bool]  # (version, building, floor, weekday, time, compact)
+
+
+# 압축 미들웨어(br/gzip)가 본문을 바꾸므로 ETag 는 약한 비교용(W/)으로 내고 인코딩별로 캐시하게 한다
+VARY_HEADERS = {"Vary": "Accept-Encoding"}
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "boundary", "max_age", "expires_at")
+
+    def __init__(self, body: bytes, etag: str, max_age: int, boundary: Optional[int] = None):
+        self.body = body
+        self.etag = etag
+        self.boundary = boundary  # 응답이 바뀌는 다음 수업 시작/종료 분 (cache_control 참고)
+        self.max_age = max_age
+        self.expires_at = time.monotonic() + max_age
+
+
+def make_etag(key: tuple, boundary: Optional[int] = None) -> str:
+    """
+    데이터셋 버전 + 조회 조건 (+ 다음 경계 시각)으로 만든 약한 ETag.
+    같은 내용이 br/gzip/identity 로 다르게 인코딩되어 나가므로 바이트 단위로 같다고 보장하지 않는다.
+    """
+    raw = "|".join(str(part) for part in (*key, boundary))
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def seconds_until(target_min: int, boundary: Optional[int]) -> int:
+    """
+    target_min 부터 다음 수업 시작/종료 분(boundary)까지 남은 초 (서버 캐시 항목 수명).
+    경계가 없으면 자정까지. MAX_AGE_CAP_SECONDS 로 상한.
+    """
+    end_min = 24 * 60 if boundary is None else boundary
+    return max(0, min((end_min - target_min) * 60, MAX_AGE_CAP_SECONDS))
+
+
+def cache_control(day: str, target_min: int, boundary: Optional[int], now: Tuple[str, int, float]) -> str:
+    """
+    조회 시각이 지금(now: live_status.now_kst, 같은 분)이면 지금부터 다음 경계까지 max-age.
+    과거/미래 시각을 지정한 조회는 벽시계와 무관하므로 no-cache (매번 ETag 로 재검증).
+    """
+    now_day, now_min, now_sec = now
+    if day != now_day or target_min != now_min:
+        return "no-cache"
+    end_min = 24 * 60 if boundary is None else boundary
+    max_age = max(0, min(int((end_min - now_min) * 60 - now_sec), MAX_AGE_CAP_SECONDS))
+    return f"public, max-age={max_age}"
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 는 약한 비교 (W/ 유무 무시)."""
+    if not if_none_match:
+        return False
+    candidates = {_opaque_tag(c.strip()) for c in if_none_match.split(",")}
+    return "*" in candidates or _opaque_tag(etag) in candidates
+
+
+class RoomStatusCache:
+    """
+    /api/rooms 응답(JSON 바이트) 캐시.
+    각 항목은 해당 건물의 다음 수업 시작/종료 시각까지만 유효하고, 키에 데이터셋 버전이 들어가므로
+    시간표가 다시 적재되면 이전 항목은 자연히 쓰이지 않는다. 항목 수는 LRU 로 제한.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: CacheKey, entry: CachedResponse):
+        if entry.max_age <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def get_room_cache(request: Request) -> RoomStatusCache:
+    return request.app.room_cache
@@ -0,0 +1,10 @@
+from fastapi.responses import JSONResponse
+from typing import Any
+import orjson
+
+
+class ORJSONResponse(JSONResponse):
+    """orjson 으로 직렬화하는 JSON 응답. dict/list 를 그대로 넘기면 jsonable_encoder 를 거치지 않는다."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,66 @@
+import re
+from typing import Any, Dict, Tuple
+
+FLOOR_RE = re.compile(r"(B?\d+)")
+SORT_KEY_OFFSET = 1000  # 지하층(음수) 키도 0 이상이 되도록 더하는 값
+
+
+def extract_floor(room: str) -> str:
+    """
+    강의실 문자열에서 층 정보를 추출.
+    예) '414' -> '4', 'B106' -> 'B1', '1201' -> '12'
+    규칙:
+      - 앞 1~2자리가 층(지하: 'B' + 숫자)
+      - 숫자만 시작하면 마지막 두 자리는 호수로 보고 그 앞을 층으로 간주
+    """
+    # 지하(B) 포함 가능, 숫자 연속 캡처
+    match = FLOOR_RE.match(room)
+    if not match:
+        return "?"
+    prefix = match.group(1)  # 예: 'B106' 또는 '414' 또는 '1201'
+
+    if prefix.startswith("B"):
+        # 'B106' -> 'B1' 로 처리
+        # 'B' 다음의 첫 자리 숫자를 층으로 판단
+        digits = prefix[1:]
+        return f"B{digits[0]}" if digits else "B?"
+    else:
+        # '414' -> '4', '1201' -> '12'
+        if len(prefix) <= 2:
+            # '10' 같은 경우 전체가 층일 가능성: '10'층
+            return prefix
+        return prefix[:-2]
+
+
+def floor_sort_key(fl: str) -> int:
+    """층 문자열('B1', '4', '12', '?')을 정렬용 정수로 변환."""
+    if fl.startswith("B"):
+        # 지하층을 맨 앞쪽으로 (B1, B2, ...)
+        try:
+            bnum = int(fl[1:])  # 'B1' -> 1
+        except ValueError:
+            bnum = 99
+        return -100 + (-bnum)  # B1 < B2 < ... < B99
+    try:
+        return int(fl)  # '12' -> 12
+    except ValueError:
+        return 999  # 알 수 없는 층은 맨 뒤
+
+
+def room_sort_key(room: str) -> Tuple[int, str]:
+    """정렬 키: 층 → 방이름"""
+    return floor_sort_key(extract_floor(room)), room
+
+
+def room_catalog_doc(building: int, room: str) -> Dict[str, Any]:
+    """
+    강의실 카탈로그 도큐먼트.
+    sort_key 는 (층 → 방이름) 순서를 문자열 비교로 재현하도록 층 키를 0-패딩한 값.
+    """
+    fl = extract_floor(room)
+    return {
+        "building": building,
+        "room": room,
+        "floor": fl,
+        "sort_key": f"{floor_sort_key(fl) + SORT_KEY_OFFSET:06d}:{room}",
+    }
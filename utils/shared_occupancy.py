@@ -0,0 +1,268 @@
+"""
+uvicorn --workers N 으로 띄웠을 때 시간표/점유 행렬을 워커 프로세스끼리 공유.
+- 워커 중 하나가 파일 잠금(flock)을 잡아 loader 가 되고, Mongo 에서 읽은 데이터를
+  세대(generation)마다 새 shared_memory 세그먼트(f"{name}_{generation}")에 기록
+- 제어 세그먼트(name)에는 현재 세대 번호와 붙어 있는 워커 수가 있고, 세대 번호를 바꾸는 것이 곧 공개(원자적 교체).
+  마지막 워커가 stop() 하면 제어 세그먼트도 지운다
+- 나머지 워커는 세대 번호가 바뀌면 새 세그먼트에 붙어(attach) 인덱스를 통째로 교체.
+  loader 는 공개하면서 만든 스냅샷을 그대로 쓰고(점유 행렬만 세그먼트 쪽으로 바꿔 끼움) 다시 읽지 않는다
+- 스냅샷 생성(공개/attach 모두)은 스레드에서 돌려 이벤트 루프를 막지 않는다
+loader 가 죽으면 잠금이 풀리고, 다음 주기에 다른 워커가 잠금을 잡아 loader 를 이어받는다.
+
+공유 범위: 워커별 복사 없이 쓰는 것은 점유 행렬(OccupancyMatrix.occ, 세그먼트 위의 읽기 전용 numpy 배열)뿐이다.
+강의 레코드는 세그먼트에 바이너리(utils/snapshot.py 형식)로 한 번만 기록되지만, 각 워커가 이를 읽어
+강의실별 RoomSchedule(dict)을 따로 만든다. 합성 캠퍼스 기준 인덱스 메모리의 약 55% (행렬)만 공유되고
+나머지 약 45% 는 워커마다 있다. 이 모드가 줄여 주는 것은 Mongo 조회(loader 한 번)와 행렬 메모리다.
+"""
+from multiprocessing import resource_tracker, shared_memory
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+import asyncio
+import fcntl
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+import orjson
+
+from utils.occupancy import (
+    DAYS, MINUTES_PER_DAY, SNAPSHOT_RETRY_SECONDS, OccupancyIndex, _Snapshot, build_snapshot, fetch_timetable,
+)
+from utils.snapshot import TimetableSnapshot, encode_snapshot
+
+# 세그먼트 헤더: 강의 스냅샷(offset, length), 카탈로그 JSON(offset, length), 점유 행렬(offset, 행 수)
+SEGMENT_HEADER = struct.Struct("<QQQQQQ")
+# 제어 세그먼트: (현재 세대 번호, 붙어 있는 워커 수)
+CONTROL = struct.Struct("<QQ")
+OCC_ALIGN = 64
+
+POLL_SECONDS = 2.0             # 워커가 세대 번호를 확인하는 간격
+ATTACH_TIMEOUT_SECONDS = 30.0  # 기동 시 loader 의 첫 공개를 기다리는 최대 시간
+
+
+# resource_tracker 는 프로세스 종료 시 등록된 세그먼트를 지워 버린다 (attach 한 쪽도 등록됨).
+# 세그먼트 수명은 여기서 직접 관리하므로 3.13+ 에서는 track=False 로 열고, 그 이전에는 등록을 해제
+_TRACK_OPTION = sys.version_info >= (3, 13)
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> shared_memory.SharedMemory:
+    # 등록 이름은 POSIX 에서 "/" 가 붙은 형태 (shm.name 은 붙지 않은 공개 이름)
+    resource_tracker.unregister("/" + shm.name if os.name == "posix" else shm.name, "shared_memory")
+    return shm
+
+
+def _open(name: str, size: int = 0) -> shared_memory.SharedMemory:
+    kwargs: Dict[str, Any] = {"create": True, "size": size} if size else {}
+    if _TRACK_OPTION:
+        return shared_memory.SharedMemory(name=name, track=False, **kwargs)
+    return _untrack(shared_memory.SharedMemory(name=name, **kwargs))
+
+
+def _unlink(name: str):
+    # 3.13 미만에서는 unlink() 가 resource_tracker 등록 해제까지 하므로 등록된 채로 연다
+    try:
+        shm = shared_memory.SharedMemory(name=name, **({"track": False} if _TRACK_OPTION else {}))
+    except FileNotFoundError:
+        return
+    shm.unlink()
+    shm.close()
+
+
+class _Attachment:
+    """세대 세그먼트 핸들. 그 세대의 점유 행렬(OccupancyMatrix.owner)이 버려질 때 함께 닫힌다."""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+
+    def __del__(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+
+
+class SharedOccupancy:
+    def __init__(self, index: OccupancyIndex, name: str, ttl_seconds: float):
+        self.index = index
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0  # 이 워커가 적재한 세대
+        self._lock_fd: Optional[int] = None
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        # 제어 세그먼트 생성/워커 수 변경/삭제를 직렬화하는 잠금 (loader 잠금과 별개, 잠깐씩만 잡음)
+        self._control_lock_path = os.path.join(tempfile.gettempdir(), f"{name}.control.lock")
+        self._next_publish = 0.0
+        self._control: Optional[shared_memory.SharedMemory] = None
+        with self._control_locked():
+            self._control = self._open_control()
+            self._add_owner(1)
+
+    @contextmanager
+    def _control_locked(self) -> Iterator[None]:
+        fd = os.open(self._control_lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # 닫으면 잠금도 풀림
+
+    def _open_control(self) -> shared_memory.SharedMemory:
+        # 제어 잠금 안에서만 호출되므로 다른 워커가 만드는 중인 세그먼트를 볼 일이 없다
+        try:
+            return _open(self.name)
+        except FileNotFoundError:
+            return _open(self.name, CONTROL.size)
+
+    def _add_owner(self, delta: int) -> int:
+        generation, owners = CONTROL.unpack_from(self._control.buf, 0)
+        owners = max(owners + delta, 0)
+        CONTROL.pack_into(self._control.buf, 0, generation, owners)
+        return owners
+
+    def _try_lock(self) -> bool:
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def current_generation(self) -> int:
+        return CONTROL.unpack_from(self._control.buf, 0)[0]
+
+    def _set_generation(self, generation: int):
+        # 워커 수 필드는 건드리지 않도록 세대 번호 8바이트만 기록
+        struct.pack_into("<Q", self._control.buf, 0, generation)
+
+    def publish(self, lectures: List[Dict[str, Any]], catalog: List[Dict[str, Any]]) -> int:
+        """
+        (loader) 새 세대 세그먼트를 만들어 기록한 뒤 세대 번호를 바꿔 공개. 이전 세대는 unlink.
+        이 워커의 인덱스도 같은 스냅샷으로 교체하므로 attach 하지 않는다. 블로킹이라 스레드에서 호출.
+        """
+        snapshot = build_snapshot(lectures, catalog)
+        occ = snapshot.matrix.occ
+        lecture_bytes = encode_snapshot(lectures)
+        catalog_bytes = orjson.dumps(catalog)
+
+        lec_off = SEGMENT_HEADER.size
+        cat_off = lec_off + len(lecture_bytes)
+        occ_off = -(-(cat_off + len(catalog_bytes)) // OCC_ALIGN) * OCC_ALIGN
+
+        previous = self.current_generation()
+        generation = previous + 1
+        seg_name = f"{self.name}_{generation}"
+        _unlink(seg_name)  # 이전 실행에서 남은 같은 이름의 세그먼트
+        shm = _open(seg_name, occ_off + occ.nbytes)
+
+        SEGMENT_HEADER.pack_into(shm.buf, 0, lec_off, len(lecture_bytes),
+                                 cat_off, len(catalog_bytes), occ_off, occ.shape[1])
+        shm.buf[lec_off:cat_off] = lecture_bytes
+        shm.buf[cat_off:cat_off + len(catalog_bytes)] = catalog_bytes
+        target = np.ndarray(occ.shape, dtype=bool, buffer=shm.buf, offset=occ_off)
+        target[:] = occ
+        target.flags.writeable = False
+        # 다른 워커와 같은 세그먼트 위의 행렬을 쓰고, 방금 채운 개인 사본은 버린다
+        snapshot.matrix.occ = target
+        snapshot.matrix.owner = _Attachment(shm)
+
+        self._set_generation(generation)
+        # 이미 붙어 있는 워커의 매핑은 unlink 후에도 유지되고, 다음 주기에 새 세대로 넘어간다
+        if previous:
+            _unlink(f"{self.name}_{previous}")
+        self.index.install(snapshot, source=f"shm:{seg_name}")
+        self.generation = generation
+        return generation
+
+    async def attach_latest(self) -> Optional[int]:
+        """공개된 세대가 바뀌었으면 붙어서 인덱스를 교체하고 세대 번호를 반환. 그대로면 None."""
+        generation = self.current_generation()
+        if generation == 0 or generation == self.generation:
+            return None
+        snapshot = await asyncio.to_thread(self._read_generation, generation)
+        if snapshot is None:
+            return None
+        self.index.install(snapshot, source=f"shm:{self.name}_{generation}")
+        self.generation = generation
+        return generation
+
+    def _read_generation(self, generation: int) -> Optional[_Snapshot]:
+        """세대 세그먼트를 읽어 (점유 행렬은 세그먼트를 그대로 가리키는) 스냅샷을 만든다. 블로킹."""
+        try:
+            shm = _open(f"{self.name}_{generation}")
+        except FileNotFoundError:
+            # 그 사이 다음 세대가 공개되어 지워졌으면 다음 주기에 다시 시도
+            return None
+
+        lec_off, lec_len, cat_off, cat_len, occ_off, rows = SEGMENT_HEADER.unpack_from(shm.buf, 0)
+        view = shm.buf[lec_off:lec_off + lec_len]
+        snapshot = TimetableSnapshot(view)
+        try:
+            lectures = list(snapshot.iter_lectures())
+        finally:
+            snapshot.close()
+            view.release()
+        catalog = orjson.loads(bytes(shm.buf[cat_off:cat_off + cat_len]))
+
+        occ = np.ndarray((len(DAYS), rows, MINUTES_PER_DAY), dtype=bool, buffer=shm.buf, offset=occ_off)
+        occ.flags.writeable = False
+        return build_snapshot(lectures, catalog, occ, _Attachment(shm))
+
+    async def _publish_from(self, db):
+        try:
+            lectures, catalog = await fetch_timetable(db)
+            generation = await asyncio.to_thread(self.publish, lectures, catalog)
+        except Exception:
+            self._next_publish = time.monotonic() + SNAPSHOT_RETRY_SECONDS
+            raise
+        self._next_publish = time.monotonic() + self.ttl_seconds
+        print(f"occupancy 공유 메모리 세대 {generation} 공개 ({len(lectures)}개 강의)")
+
+    async def load(self, db) -> int:
+        """기동 시 적재. loader 면 Mongo 에서 읽어 공개하고, 아니면 loader 의 공개를 기다렸다 붙는다."""
+        if self._try_lock():
+            await self._publish_from(db)
+        deadline = time.monotonic() + ATTACH_TIMEOUT_SECONDS
+        while self.generation == 0 and await self.attach_latest() is None:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"no occupancy generation published in {self.name}")
+            await asyncio.sleep(0.2)
+        return self.index.lecture_count
+
+    async def run(self, db):
+        """OccupancyIndex.run_refresher 대신 실행. loader 는 ttl 마다 재공개, 모든 워커는 새 세대로 교체."""
+        while True:
+            await asyncio.sleep(POLL_SECONDS)
+            try:
+                if self._try_lock() and time.monotonic() >= self._next_publish:
+                    await self._publish_from(db)
+                generation = await self.attach_latest()
+                if generation is not None:
+                    print(f"occupancy 공유 메모리 세대 {generation} 적재")
+            except Exception as e:
+                print("occupancy 공유 메모리 갱신 실패:", e)
+
+    def stop(self):
+        """
+        loader 면 현재 세대를 지우고 잠금을 놓는다 (남은 워커 중 하나가 이어받아 다시 공개).
+        마지막 워커면 제어 세그먼트까지 지운다.
+        """
+        if self._control is None:
+            return
+        with self._control_locked():
+            generation = self.current_generation()
+            if self._lock_fd is not None:
+                _unlink(f"{self.name}_{generation}")
+                os.close(self._lock_fd)
+                self._lock_fd = None
+            if self._add_owner(-1) == 0:
+                _unlink(f"{self.name}_{generation}")
+                _unlink(self.name)
+            self._control.close()
+            self._control = None
@@ -0,0 +1,47 @@
+from fastapi import Request
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 조회는 먼저 시작된 코루틴 하나만 실행하고 그 결과(또는 예외)를 함께 받는다.
+    실행은 별도 태스크라서 처음 요청한 클라이언트가 끊겨도 나머지 대기자는 결과를 받는다.
+    완료되면 키가 지워지므로 결과를 캐시하지는 않는다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # 대기자가 모두 끊긴 경우에도 "exception was never retrieved" 경고가 남지 않도록 확인만 해 둔다
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+def get_single_flight(request: Request) -> SingleFlight:
+    return request.app.single_flight
@@ -0,0 +1,156 @@
+"""
+강의 시간표 바이너리 스냅샷 (data/excel_to_json.py 가 생성, 앱이 mmap 으로 읽음).
+
+레이아웃 (little-endian)
+  header   : magic(8s) record_count(I) string_count(I) strings_offset(Q) records_offset(Q)
+  strings  : 오프셋 배열 (string_count + 1) × u32, 이어서 UTF-8 바이트
+  records  : record_count × RECORD (고정 폭)
+문자열 필드(room, course_id, course_name, professor, start_time, end_time)는 문자열 테이블 인덱스.
+"""
+from typing import Any, Dict, Iterator, List, Optional
+import mmap
+import os
+import struct
+
+from utils.time_utils import lecture_minutes
+
+MAGIC = b"VRSNAP01"
+HEADER = struct.Struct("<8sIIQQ")
+# building, room, day, (pad), start_min, end_min, course_id, course_name, professor, start_time, end_time
+RECORD = struct.Struct("<IIBxHHIIIII")
+NULL_STR = 0xFFFFFFFF
+
+# 요일 코드 (utils.occupancy.DAYS 와 같은 순서). 변환 스크립트가 앱 의존성을 끌어오지 않도록 따로 둔다
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+STRING_FIELDS = ("course_id", "course_name", "professor", "start_time", "end_time")
+
+
+def encode_snapshot(lectures: List[Dict[str, Any]]) -> bytes:
+    """강의 목록을 스냅샷 바이트로 인코딩."""
+    strings: List[str] = []
+    positions: Dict[str, int] = {}
+
+    def intern(value: Optional[Any]) -> int:
+        if value is None:
+            return NULL_STR
+        value = str(value)
+        pos = positions.get(value)
+        if pos is None:
+            pos = positions[value] = len(strings)
+            strings.append(value)
+        return pos
+
+    records = bytearray()
+    for lec in lectures:
+        start_min, end_min = lecture_minutes(lec)
+        records += RECORD.pack(
+            int(lec["building"]), intern(lec["room"]), DAYS.index(lec["day"]),
+            start_min, end_min,
+            *(intern(lec.get(field)) for field in STRING_FIELDS),
+        )
+
+    blob = bytearray()
+    offsets = [0]
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    offset_table = struct.pack(f"<{len(offsets)}I", *offsets)
+
+    strings_offset = HEADER.size
+    records_offset = strings_offset + len(offset_table) + len(blob)
+    header = HEADER.pack(MAGIC, len(lectures), len(strings), strings_offset, records_offset)
+    return b"".join((header, offset_table, blob, records))
+
+
+def write_snapshot(path: str, lectures: List[Dict[str, Any]]):
+    """강의 목록을 스냅샷 파일로 저장. 임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일을 본다."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_snapshot(lectures))
+    os.replace(tmp_path, path)
+
+
+class TimetableSnapshot:
+    """
+    스냅샷 바이트(bytes, mmap, shared_memory 등 버퍼)를 복사 없이 읽는다. 열 때는 헤더만 읽고,
+    문자열은 필요할 때 디코딩, 레코드는 struct.iter_unpack 으로 순회한다.
+    파일은 TimetableSnapshot.open(path) 로 mmap 해서 연다.
+    """
+
+    def __init__(self, buffer):
+        self._mm = None
+        self._file = None
+        view = memoryview(buffer)
+        magic, self.record_count, self.string_count, strings_offset, records_offset = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            view.release()
+            raise ValueError("not a timetable snapshot")
+
+        offsets_end = strings_offset + 4 * (self.string_count + 1)
+        self._view = view
+        self._offsets = view[strings_offset:offsets_end].cast("I")
+        self._blob = view[offsets_end:records_offset]
+        self._records = view[records_offset:records_offset + RECORD.size * self.record_count]
+        self._strings: List[Optional[str]] = [None] * self.string_count
+
+    @classmethod
+    def open(cls, path: str) -> "TimetableSnapshot":
+        f = open(path, "rb")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            snapshot = cls(mm)
+        except ValueError:
+            mm.close()
+            f.close()
+            raise ValueError(f"{path} is not a timetable snapshot")
+        snapshot._mm, snapshot._file = mm, f
+        return snapshot
+
+    def string(self, i: int) -> Optional[str]:
+        if i == NULL_STR:
+            return None
+        s = self._strings[i]
+        if s is None:
+            s = self._strings[i] = bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+        return s
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def iter_lectures(self) -> Iterator[Dict[str, Any]]:
+        """2025_2_lectures 도큐먼트와 같은 형태의 dict 로 순회."""
+        string = self.string
+        for (building, room, day, start_min, end_min,
+             course_id, course_name, professor, start_time, end_time) in RECORD.iter_unpack(self._records):
+            yield {
+                "building": building,
+                "room": string(room),
+                "day": DAYS[day],
+                "start_time": string(start_time),
+                "end_time": string(end_time),
+                "start_min": start_min,
+                "end_min": end_min,
+                "course_id": string(course_id),
+                "course_name": string(course_name),
+                "professor": string(professor),
+            }
+
+    def close(self):
+        # memoryview 가 남아 있으면 mmap/shared_memory 를 닫을 수 없으므로 먼저 해제
+        for name in ("_offsets", "_blob", "_records", "_view"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+
+
+def load_index_from_snapshot(index, path: str) -> int:
+    """스냅샷을 mmap 으로 열어 OccupancyIndex 에 적재하고 강의 수를 반환 (Mongo 없이 기동할 때 사용)."""
+    snapshot = TimetableSnapshot.open(path)
+    try:
+        return index.load(list(snapshot.iter_lectures()), source=path)
+    finally:
+        snapshot.close()
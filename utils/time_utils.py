@@ -1,11 +1,3 @@
-from datetime import datetime
-
-def calculate_minutes_diff(start: str, end: str) -> int:
-    s = datetime.strptime(start, "%H:%M")
-    e = datetime.strptime(end, "%H:%M")
-    delta = e - s
-    return int(delta.total_seconds() // 60)
-
 def format_minutes_to_string(minutes: int) -> str:
     hours = minutes // 60
     mins = minutes % 60
@@ -14,4 +6,18 @@ def format_minutes_to_string(minutes: int) -> str:
     elif hours:
         return f"{hours}시간"
     else:
-        return f"{mins}분"
\ No newline at end of file
+        return f"{mins}분"
+def time_to_minutes(hhmm: str) -> int:
+    """'HH:MM' (또는 'H:MM') → 자정 기준 분"""
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+def lecture_minutes(lec: dict) -> tuple:
+    """강의 도큐먼트의 (start_min, end_min). 정수 필드가 없으면(마이그레이션 전) 문자열에서 계산."""
+    start = lec.get("start_min")
+    end = lec.get("end_min")
+    if start is None:
+        start = time_to_minutes(lec["start_time"])
+    if end is None:
+        end = time_to_minutes(lec["end_time"])
+    return start, end